@@ -0,0 +1,50 @@
+"""
+The headless scheduling engine. Everything needed to turn course times into
+weekly schedules lives here, with no dependency on PySide or qdarkstyle, so it
+can be imported quickly from batch jobs and servers without a display. The GUI
+in scheduler.py is just a thin client over this package.
+
+Basic usage:
+
+    from schedengine import importClasses, generate, formatTable
+
+    courses = importClasses(['COP3502 M9:30-10:20 W9:30-10:20',
+                             'MAC2311 T10:00-11:15 R10:00-11:15'])
+    for week in generate(courses, 2):
+        print(formatTable(week))
+
+iterSchedules is the lazy version of generate, yielding schedules one at a time
+as they are found. parallelSchedules yields the same schedules, but spreads the
+search across every CPU core. topSchedules finds only the best few schedules
+according to an Objectives object, without enumerating the rest. Passing 
+mode='csp' to generate (or using iterConstrained) swaps the plain backtracking
+search for a constraint propagation one, which is much quicker on dense catalogs.
+countSchedules sizes the result without building it, so huge results can be
+ranked with topSchedules instead, and ScheduleIndex stores generated schedules
+compactly and filters them quickly.
+
+schedengine.batch validates and scores whole batches of schedules with NumPy, when
+it is installed. It isn't imported here, so importing schedengine never pays for
+loading NumPy.
+"""
+
+from schedengine.course import Course
+from schedengine.parser import importClasses, parseCourse, formatCourse
+from schedengine.catalog import iterCatalog, loadCatalog
+from schedengine.solver import (CoursePool, SearchProgress, RunStats, findMatches, iterMatches,
+                                iterSchedules, iterSchedulesWith, iterConstrained, generate)
+from schedengine.table import formatTable
+from schedengine.parallel import parallelSchedules
+from schedengine.ranking import Objectives, topSchedules
+from schedengine.cache import ScheduleCache
+from schedengine.incremental import IncrementalSolver
+from schedengine.stats import runInstrumented, profileRun
+from schedengine.count import countSchedules
+from schedengine.index import ScheduleIndex
+
+__all__ = ['Course', 'CoursePool', 'SearchProgress', 'RunStats', 'importClasses',
+           'parseCourse', 'formatCourse', 'iterCatalog', 'loadCatalog', 'findMatches',
+           'iterMatches', 'iterSchedules', 'iterSchedulesWith', 'iterConstrained', 'generate',
+           'formatTable', 'parallelSchedules', 'Objectives', 'topSchedules', 'ScheduleCache',
+           'IncrementalSolver', 'runInstrumented', 'profileRun', 'countSchedules',
+           'ScheduleIndex']
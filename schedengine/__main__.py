@@ -0,0 +1,5 @@
+import sys
+
+from schedengine.cli import main
+
+sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Validates, describes and scores many schedules at once, for bulk offline runs
+(ex: every student in a cohort) where the per-object loops in Course.valid and
+ScheduleIndex are the bottleneck. Sections are laid out as arrays of (day,
+start, end) meetings and schedules as rows of section indices, so that each
+check is a handful of NumPy operations over the whole batch.
+
+NumPy is optional. Without it, the same functions fall back to pure Python and
+return lists instead of arrays.
+
+    sections, rows = weeksToRows(weeks)
+    valid = validateBatch(sections, rows)
+    costs = scoreBatch(sections, rows, Objectives(dayWeight=30))
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from schedengine.course import minutesPerDay, toMinutes
+from schedengine.index import ScheduleIndex
+from schedengine.solver import buildCompatibility
+
+
+class SectionArrays(object):
+    """
+    A table of sections, as parallel arrays of their meetings plus a pairwise
+    compatibility matrix. Schedules refer to sections by their index in courses
+    """
+
+    def __init__(self, courses):
+        """
+        Args:
+            courses: A list of Course objects
+        """
+        self.courses = list(courses)
+        if numpy is None:
+            self.compatible = buildCompatibility(self.courses)
+            return
+
+        count = len(self.courses)
+        width = max([len(course.meetings()) for course in self.courses] + [1])
+
+        # Meetings padded out to the same number per section, with present
+        # marking the real ones
+        self.days = numpy.zeros((count, width), dtype=numpy.int32)
+        self.starts = numpy.zeros((count, width), dtype=numpy.int32)
+        self.ends = numpy.zeros((count, width), dtype=numpy.int32)
+        self.present = numpy.zeros((count, width), dtype=bool)
+        self.dayMasks = numpy.zeros(count, dtype=numpy.uint8)
+        for i, course in enumerate(self.courses):
+            for j, (day, start, end) in enumerate(course.meetings()):
+                self.days[i, j] = day
+                self.starts[i, j] = toMinutes(start)
+                self.ends[i, j] = toMinutes(end)
+                self.present[i, j] = True
+                self.dayMasks[i] |= 1 << day
+
+        self.compatible = self.buildCompatibility()
+
+    def buildCompatibility(self):
+        """
+        The vectorised version of solver.buildCompatibility. Two sections clash if
+        they share a name or any of their meetings touch, just like Course.valid
+
+        Returns:
+            A boolean matrix. Entry [i, j] is True when courses[i] and courses[j]
+            can be placed in the same schedule
+        """
+        owners = numpy.nonzero(self.present)[0]
+        weekStarts = (self.days * minutesPerDay + self.starts)[self.present]
+        weekEnds = (self.days * minutesPerDay + self.ends)[self.present]
+
+        # Every meeting against every other, inclusive of end points like the masks
+        overlap = (weekStarts[:, None] <= weekEnds[None, :]) & \
+                (weekStarts[None, :] <= weekEnds[:, None])
+        first, second = numpy.nonzero(overlap)
+
+        names = numpy.unique([course.name for course in self.courses], return_inverse=True)[1]
+        clash = names[:, None] == names[None, :]
+        clash[owners[first], owners[second]] = True
+        return ~clash
+
+
+def weeksToRows(weeks):
+    """
+    Turns schedules into a section table and rows of indices into it
+
+    Args:
+        weeks: A list of schedules, each one a list of the same number of Course
+            objects
+
+    Returns:
+        A (SectionArrays, rows) tuple. rows is a 2D integer array, or a list of
+        lists without NumPy
+    """
+    index = {}
+    courses = []
+    rows = []
+    for week in weeks:
+        row = []
+        for course in week:
+            if course not in index:
+                index[course] = len(courses)
+                courses.append(course)
+            row.append(index[course])
+        rows.append(row)
+
+    if numpy is not None:
+        width = len(rows[0]) if rows else 0
+        rows = numpy.array(rows, dtype=numpy.int32).reshape(len(rows), width)
+    return SectionArrays(courses), rows
+
+
+def validateBatch(sections, rows):
+    """
+    Checks whether each schedule's sections can all be taken together
+
+    Args:
+        sections: A SectionArrays
+        rows: Schedules as rows of indices into sections.courses
+
+    Returns:
+        One bool per schedule, as an array or a list
+    """
+    if numpy is None:
+        compatible = sections.compatible
+        return [all(compatible[row[a]] >> row[b] & 1
+                    for a in range(len(row)) for b in range(a + 1, len(row)))
+                for row in rows]
+
+    rows = numpy.asarray(rows)
+    valid = numpy.ones(len(rows), dtype=bool)
+    for a in range(rows.shape[1]):
+        for b in range(a + 1, rows.shape[1]):
+            valid &= sections.compatible[rows[:, a], rows[:, b]]
+    return valid
+
+
+def batchFeatures(sections, rows):
+    """
+    The same per-schedule features ScheduleIndex keeps, for a whole batch
+
+    Args:
+        sections: A SectionArrays
+        rows: Schedules as rows of indices into sections.courses
+
+    Returns:
+        A dict of 'freeDays', 'firstStart', 'lastEnd' and 'gapMinutes', each with
+        one value per schedule (see ScheduleIndex). Values are arrays, or lists
+        without NumPy
+    """
+    if numpy is None:
+        index = ScheduleIndex([[sections.courses[section] for section in row] for row in rows])
+        return {'freeDays': list(index.freeDays), 'firstStart': list(index.firstStart),
+                'lastEnd': list(index.lastEnd), 'gapMinutes': list(index.gapMinutes)}
+
+    rows = numpy.asarray(rows)
+    count = len(rows)
+    shape = (count, rows.shape[1] * sections.days.shape[1])
+    days = sections.days[rows].reshape(shape)
+    starts = sections.starts[rows].reshape(shape)
+    ends = sections.ends[rows].reshape(shape)
+    present = sections.present[rows].reshape(shape)
+
+    busy = numpy.bitwise_or.reduce(sections.dayMasks[rows], axis=1) if rows.shape[1] else \
+            numpy.zeros(count, dtype=numpy.uint8)
+    freeDays = ~busy & 0xfe
+
+    firstStart = numpy.where(present, starts, minutesPerDay).min(axis=1, initial=minutesPerDay)
+    lastEnd = numpy.where(present, ends, 0).max(axis=1, initial=0)
+    firstStart[firstStart == minutesPerDay] = 0
+
+    # Sort every schedule's meetings into week order, missing ones last, then add
+    # up the space between neighbours that fall on the same day
+    order = numpy.argsort(numpy.where(present, days * minutesPerDay + starts,
+                                      8 * minutesPerDay), axis=1, kind='stable')
+    days = numpy.take_along_axis(days, order, axis=1)
+    starts = numpy.take_along_axis(starts, order, axis=1)
+    ends = numpy.take_along_axis(ends, order, axis=1)
+    present = numpy.take_along_axis(present, order, axis=1)
+    neighbours = present[:, 1:] & present[:, :-1] & (days[:, 1:] == days[:, :-1])
+    gaps = numpy.where(neighbours, numpy.maximum(starts[:, 1:] - ends[:, :-1], 0), 0)
+
+    return {'freeDays': freeDays, 'firstStart': firstStart, 'lastEnd': lastEnd,
+            'gapMinutes': gaps.sum(axis=1)}
+
+
+def scoreBatch(sections, rows, objectives):
+    """
+    Objectives.cost for a whole batch of schedules
+
+    Args:
+        sections: A SectionArrays
+        rows: Schedules as rows of indices into sections.courses
+        objectives: An Objectives object
+
+    Returns:
+        One cost per schedule, as an array or a list
+    """
+    if numpy is None:
+        return [objectives.cost([sections.courses[section] for section in row]) for row in rows]
+
+    rows = numpy.asarray(rows)
+    features = batchFeatures(sections, rows)
+    sectionCosts = numpy.array([objectives.sectionCost(course) for course in sections.courses])
+    daysOnCampus = numpy.unpackbits((~features['freeDays'] & 0xfe)[:, None], axis=1).sum(axis=1)
+    return objectives.dayWeight * daysOnCampus + objectives.gapWeight * features['gapMinutes'] + \
+            sectionCosts[rows].sum(axis=1)
@@ -0,0 +1,276 @@
+"""
+Benchmarks for the engine, run headlessly against synthetic course catalogs.
+
+    python -m schedengine.bench
+    python -m schedengine.bench --save baseline.json
+    python -m schedengine.bench --compare baseline.json
+
+Each scenario times importClasses, the search and formatTable separately (each
+repeated until it is long enough to measure, keeping the median across runs), and
+records the number of search nodes, schedules found and peak memory. Saved 
+results can be compared against later runs to catch regressions in the solver.
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import json
+import random
+import sys
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from schedengine import course, parser, table
+from schedengine.parser import importClasses
+from schedengine.solver import SearchProgress, clock, iterSchedules
+from schedengine.table import formatTable
+
+dayLetters = 'MTWRF'
+
+# Each phase is run over and over until it has taken at least this many seconds,
+# so that sub-millisecond phases are measured well above the clock's noise
+minPhaseTime = 0.05
+
+phases = ['parseTime', 'searchTime', 'formatTime']
+
+# Name: (courses, sections per course, days per section, overlap)
+scenarios = [
+    ('small', 4, 3, 2, 0.3),
+    ('typical', 6, 5, 2, 0.5),
+    ('wide', 8, 5, 2, 0.2),
+    ('dense', 6, 10, 2, 0.7),
+    ('large', 10, 8, 2, 0.4),
+]
+
+
+def syntheticCatalog(numCourses, sectionsPerCourse, daysPerSection=2, overlap=0.5, seed=0):
+    """
+    Makes up a course catalog in the format importClasses expects
+
+    Args:
+        numCourses: How many distinct course names there are
+        sectionsPerCourse: How many sections each course has
+        daysPerSection: How many days of the week each section meets
+        overlap: From 0 to 1. Sections start anywhere from 8:00 to 20:00 at an
+            overlap of 0, and get squeezed into a narrower window (down to an hour)
+            as it goes up, so more of them conflict
+        seed: Seed for the random number generator, so catalogs are repeatable
+
+    Returns:
+        A list of formatted course strings, ex: COP3502 M9:30-10:20 W9:30-10:20
+    """
+    rand = random.Random(seed)
+    window = max(60, int((1 - overlap) * 12 * 60))
+    daysPerSection = min(daysPerSection, len(dayLetters))
+    classes = []
+
+    for course in range(numCourses):
+        name = 'SYN%04d' % course
+        for section in range(sectionsPerCourse):
+            start = 8 * 60 + rand.randrange(0, window, 15)
+            end = start + rand.choice([50, 75, 110])
+            days = sorted(rand.sample(range(len(dayLetters)), daysPerSection))
+            times = '%d:%02d-%d:%02d' % (start // 60, start % 60, end // 60, end % 60)
+            classes.append(' '.join([name] + [dayLetters[day] + times for day in days]))
+    return classes
+
+
+def clearCaches():
+    """
+    Empties the parser's, courses' and formatter's caches, so every run starts
+    out cold
+    """
+    parser.parseCache.clear()
+    course.meetingCache.clear()
+    table.cellCache.clear()
+    table.layoutCache.clear()
+
+
+def timePhase(func, setup=None):
+    """
+    Times func, calling it as many times as it takes to fill minPhaseTime
+
+    Args:
+        func: The phase to time, taking no arguments
+        setup: Called before every call to func, untimed (ex: to empty caches)
+
+    Returns:
+        A (seconds per call, func's last result) tuple
+    """
+    calls = 0
+    elapsed = 0.0
+    while calls == 0 or elapsed < minPhaseTime:
+        if setup is not None:
+            setup()
+        start = clock()
+        result = func()
+        elapsed += clock() - start
+        calls += 1
+    return elapsed / calls, result
+
+
+def formatAll(weeks):
+    for week in weeks:
+        formatTable(week)
+
+
+def runScenario(name, numCourses, sectionsPerCourse, daysPerSection, overlap, seed=0):
+    """
+    Runs one scenario, timing each phase of the engine
+
+    Returns:
+        A dict of the scenario's settings and measurements
+    """
+    classes = syntheticCatalog(numCourses, sectionsPerCourse, daysPerSection, overlap, seed)
+    gc.collect()
+
+    parseTime, courses = timePhase(lambda: importClasses(classes), clearCaches)
+
+    progress = SearchProgress()
+    searchTime, weeks = timePhase(lambda: list(iterSchedules(courses, numCourses)))
+    list(iterSchedules(courses, numCourses, progress))
+
+    formatTime = timePhase(lambda: formatAll(weeks), clearCaches)[0]
+
+    return {
+        'name': name,
+        'courses': numCourses,
+        'sections': sectionsPerCourse,
+        'days': daysPerSection,
+        'overlap': overlap,
+        'seed': seed,
+        'parseTime': parseTime,
+        'searchTime': searchTime,
+        'formatTime': formatTime,
+        'totalTime': parseTime + searchTime + formatTime,
+        'nodes': progress.nodes,
+        'schedules': progress.found,
+    }
+
+
+def peakMemory(numCourses, sectionsPerCourse, daysPerSection, overlap, seed=0):
+    """
+    Measures the peak memory of parsing and searching a scenario. Tracing every
+    allocation slows everything down a lot, so this is kept apart from the timed
+    runs. Returns None on Pythons without tracemalloc
+    """
+    if tracemalloc is None:
+        return None
+
+    classes = syntheticCatalog(numCourses, sectionsPerCourse, daysPerSection, overlap, seed)
+    clearCaches()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        weeks = list(iterSchedules(importClasses(classes), numCourses))
+        for week in weeks:
+            formatTable(week)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2.0
+
+
+def medianOf(repeat, name, *args):
+    """
+    Runs a scenario repeat times and keeps the median of each phase, which one
+    unlucky run can't drag around the way it can a single time or a mean. Peak
+    memory is measured in one extra run
+    """
+    runs = [runScenario(name, *args) for i in range(repeat)]
+    result = runs[0]
+    for phase in phases:
+        result[phase] = median(run[phase] for run in runs)
+    result['totalTime'] = sum(result[phase] for phase in phases)
+    result['peakBytes'] = peakMemory(*args)
+    return result
+
+
+def printResults(results):
+    header = '%-10s %9s %9s %9s %10s %10s %10s' % ('scenario', 'parse ms', 'search ms',
+                                                  'format ms', 'nodes', 'schedules', 'peak KiB')
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        peak = '-' if result['peakBytes'] is None else '%d' % (result['peakBytes'] // 1024)
+        print('%-10s %9.1f %9.1f %9.1f %10d %10d %10s' % (result['name'], 
+              result['parseTime'] * 1000, result['searchTime'] * 1000, 
+              result['formatTime'] * 1000, result['nodes'], result['schedules'], peak))
+
+
+def compareResults(results, baseline, threshold):
+    """
+    Prints how each phase of each scenario changed against a baseline run
+
+    Args:
+        results: This run's results
+        baseline: A previous run's results, as saved by --save
+        threshold: The slowdown ratio past which a phase counts as a regression
+
+    Returns:
+        The names of the scenarios that regressed
+    """
+    previous = dict((result['name'], result) for result in baseline)
+    regressions = []
+    print()
+    print('%-10s %9s %9s %9s' % ('scenario', 'parse', 'search', 'format'))
+    for result in results:
+        old = previous.get(result['name'])
+        if old is None:
+            continue
+        ratios = [result[phase] / max(old[phase], 1e-9) for phase in phases]
+        flag = ''
+        if max(ratios) > threshold:
+            flag = '  REGRESSION'
+            regressions.append(result['name'])
+        elif old['schedules'] != result['schedules']:
+            flag = '  schedule count changed from %d' % old['schedules']
+        print('%-10s %8.2fx %8.2fx %8.2fx%s' % ((result['name'],) + tuple(ratios) + (flag,)))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the scheduling engine')
+    parser.add_argument('--courses', type=int, help='run a single custom scenario with this many courses')
+    parser.add_argument('--sections', type=int, default=5, help='sections per course (custom scenario)')
+    parser.add_argument('--days', type=int, default=2, help='days per section (custom scenario)')
+    parser.add_argument('--overlap', type=float, default=0.5, help='overlap density from 0 to 1 (custom scenario)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the catalogs')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='runs per scenario, the median of each phase is kept')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='compare against results saved by --save')
+    parser.add_argument('--threshold', type=float, default=1.25, 
+                        help='slowdown ratio of any phase that counts as a regression')
+    args = parser.parse_args(argv)
+
+    if args.courses:
+        runs = [('custom', args.courses, args.sections, args.days, args.overlap)]
+    else:
+        runs = scenarios
+
+    results = [medianOf(args.repeat, *(run + (args.seed,))) for run in runs]
+    printResults(results)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            if compareResults(results, json.load(f), args.threshold):
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Caches generated schedules so that generating the same scenario again (or after
+a restart) doesn't rerun the search. Entries are keyed by a fingerprint of the
+course set and the required course count, and each schedule is stored as an
+array of indices into the course set's canonical (sorted) order
+"""
+
+import hashlib
+import os
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+
+from schedengine.parser import formatCourse
+from schedengine.solver import generate
+
+# On-disk entries are a small header followed by the raw index array
+fileMagic = b'SCHD'
+fileVersion = 1
+headerFormat = '<4sHHII'
+headerSize = struct.calcsize(headerFormat)
+
+
+def canonicalCourses(courses):
+    """
+    Sorts and deduplicates a course set, so the same set always comes out the same
+    no matter what order it was given in
+    """
+    return sorted(set(courses))
+
+
+def fingerprint(courses, numCourses):
+    """
+    A hash of a course set and required course count that is stable across runs
+
+    Args:
+        courses: The courses, as returned by canonicalCourses
+        numCourses: The number of courses each schedule must contain
+
+    Returns:
+        A hex string
+    """
+    digest = hashlib.sha1()
+    digest.update(('%d\n' % numCourses).encode('utf-8'))
+    for course in courses:
+        digest.update((formatCourse(course) + '\n').encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ScheduleCache(object):
+    """
+    An LRU cache of generated schedules, held in memory and optionally mirrored
+    to a directory on disk. Memory entries are evicted least recently used first
+    once there are more than maxEntries. Disk entries are never evicted
+    """
+
+    def __init__(self, maxEntries=32, directory=None):
+        """
+        Args:
+            maxEntries: How many results to keep in memory
+            directory: Where to keep results on disk, or None for memory only
+        """
+        self.maxEntries = maxEntries
+        self.directory = directory
+        self.entries = OrderedDict()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.sched')
+
+    def get(self, courses, numCourses):
+        """
+        Looks up previously generated schedules
+
+        Args:
+            courses: A list of Course objects
+            numCourses: The number of courses each schedule must contain
+
+        Returns:
+            A list of schedules (lists of Course objects), or None on a miss
+        """
+        canonical = canonicalCourses(courses)
+        key = fingerprint(canonical, numCourses)
+
+        entry = self.entries.pop(key, None)
+        if entry is None and self.directory is not None:
+            entry = self.readEntry(key)
+        if entry is None:
+            return None
+
+        # Popping and reinserting moves the entry to the most recently used end
+        self.remember(key, entry)
+        width, indices = entry
+        if width == 0:
+            return [[]]
+        return [[canonical[index] for index in indices[i:i + width]] 
+                for i in range(0, len(indices), width)]
+
+    def put(self, courses, numCourses, weeks):
+        """
+        Stores generated schedules
+
+        Args:
+            courses: The list of Course objects the schedules were generated from
+            numCourses: The number of courses each schedule contains
+            weeks: A list of schedules, each one a list of Course objects
+        """
+        canonical = canonicalCourses(courses)
+        key = fingerprint(canonical, numCourses)
+        position = dict((course, i) for i, course in enumerate(canonical))
+
+        indices = array('I')
+        for week in weeks:
+            indices.extend(position[course] for course in week)
+
+        entry = (numCourses, indices)
+        self.entries.pop(key, None)
+        self.remember(key, entry)
+        if self.directory is not None:
+            self.writeEntry(key, entry)
+
+    def generate(self, courses, numCourses):
+        """
+        The cached version of schedengine.generate
+
+        Args:
+            courses: A list of Course objects
+            numCourses: The number of courses each schedule must contain
+
+        Returns:
+            A list of schedules, each one a list of Course objects
+        """
+        weeks = self.get(courses, numCourses)
+        if weeks is None:
+            weeks = generate(canonicalCourses(courses), numCourses)
+            self.put(courses, numCourses, weeks)
+        return weeks
+
+    def clear(self):
+        """
+        Empties the in-memory cache. Anything on disk is left alone
+        """
+        self.entries.clear()
+
+    def remember(self, key, entry):
+        self.entries[key] = entry
+        while len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+
+    def readEntry(self, key):
+        """
+        Loads an entry from disk, returning None if it is missing or unreadable
+        """
+        try:
+            with open(self.path(key), 'rb') as f:
+                magic, version, width, itemSize, count = struct.unpack(headerFormat, 
+                        f.read(headerSize))
+                if magic != fileMagic or version != fileVersion or \
+                        itemSize != array('I').itemsize:
+                    return None
+                indices = array('I')
+                indices.fromfile(f, count)
+        except (IOError, OSError, EOFError, struct.error):
+            return None
+
+        if sys.byteorder == 'big':
+            indices.byteswap()
+        return (width, indices)
+
+    def writeEntry(self, key, entry):
+        """
+        Saves an entry to disk. The file is written under a temporary name and
+        then renamed, so a reader never sees a half written entry
+        """
+        width, indices = entry
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+        if sys.byteorder == 'big':
+            indices = array('I', indices)
+            indices.byteswap()
+
+        path = self.path(key)
+        tempPath = '%s.%d.tmp' % (path, os.getpid())
+        with open(tempPath, 'wb') as f:
+            f.write(struct.pack(headerFormat, fileMagic, fileVersion, width, 
+                                indices.itemsize, len(indices)))
+            indices.tofile(f)
+        if os.path.exists(path):
+            os.remove(path)
+        os.rename(tempPath, path)
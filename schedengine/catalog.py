@@ -0,0 +1,195 @@
+"""
+Bulk loading of course catalogs. Registrar exports can hold thousands of
+sections, so files are streamed a line at a time into Course objects rather than
+read in whole. Three formats are understood:
+
+Text, one section per line in the same format as the GUI's schedule list:
+
+    COP3502 M9:30-10:20 W9:30-10:20
+
+CSV with a header row, one meeting per row. Consecutive rows with the same name
+and section are merged into a single section. Without a section column, every
+row is its own section:
+
+    name,section,days,start,end
+    COP3502,1,MW,9:30,10:20
+
+JSON Lines, one section per line:
+
+    {"name": "COP3502", "meetings": [{"days": "MW", "start": "9:30", "end": "10:20"}]}
+"""
+
+import csv
+import io
+import json
+import re
+
+from schedengine.course import Course
+from schedengine.parser import parseCourse, parseTime, weekdayDict
+
+# Python 2 file dialogs hand back unicode paths
+try:
+    stringTypes = basestring
+except NameError:
+    stringTypes = str
+
+clockPattern = re.compile(r'(\d{1,2}):?(\d{2})$')
+
+
+def parseClock(text):
+    """
+    Turns a time like 9:30, 09:30 or 0930 into an integer military time
+    """
+    match = clockPattern.match(text.strip())
+    if match is None:
+        raise ValueError('Invalid time %r' % text)
+    return parseTime(match.group(1), match.group(2), text)
+
+
+def formatClock(time):
+    """
+    The reverse of parseClock, ex: 930 becomes 9:30
+    """
+    return '%d:%02d' % (time // 100, time % 100)
+
+
+def addMeeting(times, days, start, end):
+    """
+    Adds a meeting on each of the given days to a course's times dict. Checking
+    that the meetings don't overlap is left to Course
+
+    Args:
+        times: The dict of days to lists of (start, end) military times to add to
+        days: A string of day letters, ex: MWF, or SU for a weekend
+        start: The start time as a string, see parseClock
+        end: The end time as a string, see parseClock
+    """
+    start = parseClock(start)
+    end = parseClock(end)
+
+    days = days.replace(' ', '').upper()
+    if not days:
+        raise ValueError('Meeting has no days')
+    for day in days:
+        if day not in weekdayDict:
+            raise ValueError('Invalid day %r' % day)
+        times.setdefault(weekdayDict[day], []).append((start, end))
+
+
+def iterText(lines):
+    for lineNum, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            yield parseCourse(line)
+        except ValueError as e:
+            raise ValueError('Line %d: %s' % (lineNum, e))
+
+
+def iterCsv(lines):
+    reader = csv.DictReader(lines)
+    current = None
+    times = {}
+
+    for row in reader:
+        try:
+            name = row['name'].strip()
+            section = (name, (row.get('section') or '').strip())
+            if current is not None and (section != current or not section[1]):
+                yield Course(times, current[0])
+                times = {}
+            current = section
+            addMeeting(times, row['days'], row['start'], row['end'])
+        except (KeyError, AttributeError, ValueError) as e:
+            raise ValueError('Line %d: %s' % (reader.line_num, e))
+
+    if current is not None:
+        try:
+            course = Course(times, current[0])
+        except ValueError as e:
+            raise ValueError('Line %d: %s' % (reader.line_num, e))
+        yield course
+
+
+def iterJsonLines(lines):
+    for lineNum, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            times = {}
+            for meeting in record['meetings']:
+                addMeeting(times, meeting['days'], meeting['start'], meeting['end'])
+            if not times:
+                raise ValueError('Section has no meetings')
+            yield Course(times, record['name'])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError('Line %d: %s' % (lineNum, e))
+
+
+def sectionRecord(course):
+    """
+    A section in the same shape iterJsonLines reads, so output can be fed back in
+    """
+    return {
+        'name': course.name,
+        'meetings': [{'days': Course.numToDay[day], 'start': formatClock(start),
+                      'end': formatClock(end)}
+                     for day, start, end in course.meetings()],
+    }
+
+
+readers = {
+    'text': iterText,
+    'csv': iterCsv,
+    'jsonl': iterJsonLines,
+}
+
+
+def guessFormat(path):
+    """
+    Picks a catalog format from a file name's extension, defaulting to text
+    """
+    lower = path.lower()
+    if lower.endswith('.csv'):
+        return 'csv'
+    if lower.endswith('.jsonl') or lower.endswith('.ndjson'):
+        return 'jsonl'
+    return 'text'
+
+
+def iterCatalog(source, fmt=None):
+    """
+    Streams the sections in a catalog as Course objects
+
+    Args:
+        source: A file path, or an open text file (or any iterable of lines)
+        fmt: 'text', 'csv' or 'jsonl'. Guessed from the path when not given
+
+    Yields:
+        Course objects, in the order they appear in the catalog
+
+    Raises:
+        ValueError: if the catalog is malformed. The message has the line number
+    """
+    if fmt is None:
+        fmt = guessFormat(source) if isinstance(source, stringTypes) else 'text'
+    if fmt not in readers:
+        raise ValueError('Unknown catalog format %r' % fmt)
+
+    if isinstance(source, stringTypes):
+        # newline='' is what the csv module wants, and is harmless for the others
+        with io.open(source, newline='', encoding='utf-8') as f:
+            for course in readers[fmt](f):
+                yield course
+    else:
+        for course in readers[fmt](source):
+            yield course
+
+
+def loadCatalog(source, fmt=None):
+    """
+    Reads a whole catalog into a list of Course objects. See iterCatalog
+    """
+    return list(iterCatalog(source, fmt))
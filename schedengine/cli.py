@@ -0,0 +1,172 @@
+"""
+Command line batch mode. Reads a course file, runs the solver and streams the
+schedules out as they are found, without ever touching Qt.
+
+    python -m schedengine courses.csv
+    python -m schedengine courses.txt --count 4 --limit 100 --format csv -o out.csv
+
+The course file can be in any format schedengine.catalog understands.
+"""
+
+from __future__ import print_function
+
+import argparse
+import csv
+import errno
+import io
+import json
+import sys
+
+from schedengine.catalog import formatClock, loadCatalog, sectionRecord
+from schedengine.course import Course
+from schedengine.parallel import parallelSchedules
+from schedengine.parser import formatCourse
+from schedengine.solver import RunStats, solverModes
+from schedengine.stats import profileRun
+from schedengine.count import countSchedules, describeCount
+
+
+def writeJsonLines(weeks, out):
+    for number, week in weeks:
+        out.write(json.dumps({'schedule': number, 
+                              'sections': [sectionRecord(course) for course in week]}))
+        out.write('\n')
+
+
+def writeCsv(weeks, out):
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(['schedule', 'name', 'days', 'start', 'end'])
+    for number, week in weeks:
+        for course in week:
+            for day, start, end in course.meetings():
+                writer.writerow([number, course.name, Course.numToDay[day],
+                                 formatClock(start), formatClock(end)])
+
+
+def writeText(weeks, out):
+    for number, week in weeks:
+        out.write('%d: %s\n' % (number, ' | '.join(formatCourse(course) for course in week)))
+
+
+writers = {
+    'jsonl': writeJsonLines,
+    'csv': writeCsv,
+    'text': writeText,
+}
+
+
+def numbered(weeks, limit):
+    """
+    Numbers schedules from 1, stopping after limit of them if limit is given
+    """
+    for number, week in enumerate(weeks, 1):
+        if limit is not None and number > limit:
+            return
+        yield number, week
+
+
+def openOutput(path):
+    """
+    Opens the output file for the writers. On Python 2, json and csv hand back
+    byte strings, which a text mode io file won't take
+    """
+    if sys.version_info[0] < 3:
+        return open(path, 'wb')
+    return io.open(path, 'w', newline='', encoding='utf-8')
+
+
+def nonNegative(text):
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError('must be 0 or more: %s' % text)
+    return value
+
+
+def buildParser():
+    parser = argparse.ArgumentParser(prog='python -m schedengine', 
+                                     description='Generate class schedules from a course file')
+    parser.add_argument('courses', help='course file (text, .csv or .jsonl)')
+    parser.add_argument('--input-format', choices=['text', 'csv', 'jsonl'],
+                        help='format of the course file, guessed from its extension by default')
+    parser.add_argument('-n', '--count', type=nonNegative,
+                        help='number of courses in each schedule, defaults to every course name in the file')
+    parser.add_argument('-l', '--limit', type=nonNegative, help='stop after this many schedules')
+    parser.add_argument('-f', '--format', choices=sorted(writers), default='jsonl',
+                        help='output format (default: jsonl)')
+    parser.add_argument('-o', '--output', help='file to write to instead of stdout')
+    parser.add_argument('-j', '--processes', type=int,
+                        help='search with this many worker processes (0 for one per CPU)')
+    parser.add_argument('--solver', choices=sorted(solverModes), default='backtrack',
+                        help='search algorithm (default: backtrack). csp finds dead ends '
+                             'sooner on dense catalogs')
+    parser.add_argument('--count-only', action='store_true',
+                        help='only print how many schedules there are (estimated if huge)')
+    parser.add_argument('--stats', action='store_true',
+                        help='print timings and counters for each phase to stderr')
+    parser.add_argument('--profile', metavar='PATH', nargs='?', const='',
+                        help='run under cProfile, saving the profile to PATH or printing '
+                             'the top calls to stderr if no path is given')
+    return parser
+
+
+def main(argv=None):
+    parser = buildParser()
+    args = parser.parse_args(argv)
+    if args.processes is not None and args.solver != 'backtrack':
+        parser.error('--processes only works with the backtrack solver')
+    if args.profile is not None:
+        return profileRun(args.profile or None, run, args)
+    return run(args)
+
+
+def run(args):
+    stats = RunStats() if args.stats else None
+
+    try:
+        if stats is None:
+            courses = loadCatalog(args.courses, args.input_format)
+        else:
+            with stats.timer('parse'):
+                courses = loadCatalog(args.courses, args.input_format)
+    except (IOError, ValueError) as e:
+        print('%s: %s' % (args.courses, e), file=sys.stderr)
+        return 1
+
+    numCourses = args.count
+    if numCourses is None:
+        numCourses = len(set(course.name for course in courses))
+
+    if args.count_only:
+        print(describeCount(*countSchedules(courses, numCourses)))
+        return 0
+
+    if args.processes is not None:
+        weeks = parallelSchedules(courses, numCourses, processes=args.processes or None)
+    else:
+        weeks = solverModes[args.solver](courses, numCourses, stats)
+
+    out = openOutput(args.output) if args.output else sys.stdout
+    try:
+        if stats is None:
+            writers[args.format](numbered(weeks, args.limit), out)
+        else:
+            with stats.timer('format'):
+                writers[args.format](numbered(weeks, args.limit), out)
+            # Writing pulls schedules out of the search as it goes, so the search's
+            # own share is taken back out
+            stats.times['format'] -= stats.times.get('search', 0)
+        out.flush()
+    except IOError as e:
+        # Piping into head and the like closes the pipe early, which is fine
+        if e.errno != errno.EPIPE:
+            raise
+    finally:
+        # Stopping at the limit leaves the search unfinished, and a parallel one
+        # has worker processes to shut down
+        weeks.close()
+        if out is not sys.stdout:
+            out.close()
+
+    if stats is not None:
+        print('\n'.join(stats.summary()), file=sys.stderr)
+    return 0
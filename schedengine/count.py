@@ -0,0 +1,164 @@
+"""
+Sizes the schedule space without building a single schedule, so callers can
+decide whether to enumerate everything or only rank the best few before they
+start. Counting shares the solver's compatibility bitsets and course grouping
+"""
+
+import random
+
+from schedengine.solver import CoursePool
+
+# Above this many schedules, enumerating and showing every one of them isn't
+# worth it, and only the best few should be searched for instead
+largeResult = 100000
+
+
+class StateLimitReached(Exception):
+    """
+    Raised inside countSchedules when the exact count needs too much memory
+    """
+
+
+def exactCount(pool, numCourses, maxStates):
+    """
+    Counts schedules with the same walk over course groups as iterMatches, but
+    memoised. Two partial schedules that leave the same sections open in the
+    groups still to come have exactly as many completions, so each such state is
+    only counted once
+
+    Args:
+        pool: A CoursePool
+        numCourses: The number of courses each schedule must contain
+        maxStates: How many states to remember before giving up
+
+    Returns:
+        The number of valid schedules
+
+    Raises:
+        StateLimitReached: if more than maxStates states were needed
+    """
+    groups = pool.groups
+    compatible = pool.compatible
+
+    # later[g] has a bit set for every section in groups g and up. Bits for groups
+    # that have been passed don't matter, so they are masked out of the memo key
+    later = [0] * (len(groups) + 1)
+    for group in range(len(groups) - 1, -1, -1):
+        later[group] = later[group + 1] | sum(1 << index for index in groups[group])
+
+    memo = {}
+
+    def count(group, candidates, needed):
+        if needed == 0:
+            return 1
+        remaining = len(groups) - group
+        if remaining < needed:
+            return 0
+
+        key = (group, candidates & later[group], needed)
+        if key in memo:
+            return memo[key]
+        if len(memo) >= maxStates:
+            raise StateLimitReached()
+
+        total = 0
+        for index in groups[group]:
+            if candidates >> index & 1:
+                total += count(group + 1, candidates & compatible[index], needed - 1)
+        if remaining > needed:
+            total += count(group + 1, candidates, needed)
+
+        memo[key] = total
+        return total
+
+    return count(0, (1 << len(pool.courses)) - 1, numCourses)
+
+
+def estimateCount(pool, numCourses, samples=2000, seed=0):
+    """
+    Estimates the number of schedules by following random paths down the search
+    tree (Knuth's estimator). Each path's weight is the product of the number of
+    choices along the way, or zero if it hits a dead end, and the average weight
+    is an unbiased estimate of the number of leaves.
+
+    Choices are forward checked: a section is only a choice if enough of the
+    groups after it still have an open section to fill the rest of the schedule.
+    Those branches have no schedules under them anyway, so leaving them out keeps
+    the estimate unbiased, while on tightly packed catalogs it is the difference
+    between most paths reaching a schedule and every one of them dying early
+
+    Args:
+        pool: A CoursePool
+        numCourses: The number of courses each schedule must contain
+        samples: The number of paths to follow
+        seed: Seed for the random choices, so estimates are repeatable
+
+    Returns:
+        The estimated number of valid schedules, as an int. This is never 0:
+        every path missing a schedule doesn't mean there aren't any
+    """
+    rng = random.Random(seed)
+    groups = pool.groups
+    groupMasks = [sum(1 << index for index in group) for group in groups]
+
+    def openGroups(candidates, start):
+        # How many groups from start on still have an open section
+        return sum(1 for mask in groupMasks[start:] if candidates & mask)
+
+    total = 0
+    for sample in range(samples):
+        group, candidates, needed, weight = 0, (1 << len(pool.courses)) - 1, numCourses, 1
+        while needed and weight:
+            if group == len(groups):
+                weight = 0
+                break
+
+            options = [index for index in groups[group] if candidates >> index & 1 and
+                       openGroups(candidates & pool.compatible[index], group + 1) >= needed - 1]
+            skip = openGroups(candidates, group + 1) >= needed
+            choices = len(options) + (1 if skip else 0)
+            weight *= choices
+            if choices:
+                pick = rng.randrange(choices)
+                if pick < len(options):
+                    candidates &= pool.compatible[options[pick]]
+                    needed -= 1
+            group += 1
+        total += weight
+    return max(1, int(round(total / float(samples))))
+
+
+def countSchedules(courses, numCourses, maxStates=50000, samples=2000):
+    """
+    Counts the valid schedules exactly when that can be done in reasonable memory,
+    and estimates the count otherwise
+
+    Args:
+        courses: A list of Course objects, or a CoursePool
+        numCourses: The number of courses each schedule must contain
+        maxStates: The most memo entries the exact count may use
+        samples: The number of random paths used for an estimate
+
+    Returns:
+        A (count, exact) tuple. exact is False when count is an estimate, which
+        can be far off on tightly packed catalogs, so callers deciding whether
+        enumerating everything is safe should only trust an exact count
+    """
+    pool = courses if isinstance(courses, CoursePool) else CoursePool(courses)
+    if numCourses < 0:
+        return 0, True
+    try:
+        return exactCount(pool, numCourses, maxStates), True
+    except StateLimitReached:
+        return estimateCount(pool, numCourses, samples), False
+
+
+def describeCount(count, exact):
+    """
+    A short human readable version of a countSchedules result
+
+    Returns:
+        A string like '1,024 schedules' or 'about 3,000,000 schedules'
+    """
+    return '%s%s schedule%s' % ('' if exact else 'about ', '{:,}'.format(count),
+                                '' if count == 1 else 's')
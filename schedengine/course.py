@@ -0,0 +1,208 @@
+"""
+The Course class, which holds day and time information for a single section
+"""
+
+from __future__ import print_function
+
+from functools import total_ordering
+
+# Every day gets its own block of minutes in a course's occupancy mask, so a
+# single integer can describe a whole week of meetings. Monday's block is first
+minutesPerDay = 24 * 60
+
+# Meetings and their occupancy masks, keyed by the meetings. Sections of different
+# courses often meet at the same times, and courses are read-only, so they can
+# share one copy of each
+meetingCache = {}
+maxCacheSize = 100000
+
+
+def toMinutes(time):
+    """
+    Converts an integer military time (ex: 930 for 9:30) into minutes since midnight
+    """
+    return (time // 100) * 60 + time % 100
+
+
+def normalizeTimes(times):
+    """
+    Puts a course's times into the form Course keeps them in: each day maps to a
+    tuple of (start, end) meetings sorted by start. A lone (start, end) pair is 
+    accepted for a day too, which is how single meeting days used to be given
+
+    Args:
+        times: a dict containing days (key) mapping to a (start, end) pair, or a
+            list of them
+
+    Returns:
+        The normalized dict
+
+    Raises:
+        ValueError: if a meeting ends before it starts, or two meetings on the 
+            same day overlap
+    """
+    normalized = {}
+    for day, meetings in times.items():
+        if len(meetings) == 2 and not isinstance(meetings[0], (tuple, list)):
+            meetings = [meetings]
+        meetings = tuple(sorted(tuple(meeting) for meeting in meetings))
+
+        for i, (start, end) in enumerate(meetings):
+            if end < start:
+                raise ValueError('Meeting ends before it starts: %r' % ((start, end),))
+            if i and start <= meetings[i - 1][1]:
+                raise ValueError('Meetings overlap: %r and %r' % (meetings[i - 1], (start, end)))
+        if meetings:
+            normalized[day] = meetings
+    return normalized
+
+
+@total_ordering
+class Course(object):
+    """
+    This class holds day and time information for a course such that it can be 
+    easily compared to other courses to see if two courses conflict in times.
+
+    A course can meet any number of times on a day (ex: a lecture and a lab), and
+    on weekends as well. Conflicts between any number of meetings are still a
+    single check against the occupancy mask, see buildMask.
+
+    Catalogs can hold thousands of sections, so instances use __slots__ rather
+    than carrying a dict each, and the occupancy mask only covers the minutes
+    from the course's first meeting to its last. Courses should be treated as 
+    read-only once built, as the mask and key are worked out up front
+    """
+
+    __slots__ = ('name', 'maskOffset', 'mask', 'ident', 'meetingList')
+
+    numToDay = {1:'M', 2:'T', 3:'W', 4:'R', 5:'F', 6:'S', 7:'U'}
+
+    def __init__(self, times, name):
+        """
+        Creates a new course with the given times and name
+
+        Args:
+            times: a dict containing days (key) mapping to times (values). See
+                normalizeTimes for the forms the times can take
+            name: a str containing the course name
+
+        Raises:
+            ValueError: if the times are invalid, see normalizeTimes
+        """
+        times = normalizeTimes(times)
+        self.name = name
+
+        # Only the flat list of meetings is kept, and the times dict is rebuilt
+        # from it on demand, as most uses only need one or the other
+        meetingList = tuple((day, start, end) for day in sorted(times) 
+                            for start, end in times[day])
+        shared = meetingCache.get(meetingList)
+        if shared is None:
+            if len(meetingCache) >= maxCacheSize:
+                meetingCache.clear()
+            shared = meetingCache[meetingList] = (meetingList,) + self.buildMask(times)
+        self.meetingList, self.maskOffset, self.mask = shared
+        self.ident = (name, self.meetingList)
+
+    @property
+    def times(self):
+        """
+        The course's meetings as a dict of days to tuples of (start, end) pairs,
+        the form normalizeTimes puts them in
+        """
+        times = {}
+        for day, start, end in self.meetingList:
+            times[day] = times.get(day, ()) + ((start, end),)
+        return times
+
+    @staticmethod
+    def buildMask(times):
+        """
+        Builds the occupancy bitmask for a course. Minute m of the week, counted
+        from midnight on Monday, is set for every minute the course meets,
+        endpoints included, so two courses conflict exactly when their masks share
+        a bit once lined up. This is built once here so that valid() is a shift 
+        and a single integer AND instead of a walk over every day pair.
+
+        The mask starts at the course's first occupied minute rather than at the
+        start of the week, which keeps it as short as the course's span
+
+        Args:
+            times: a normalized times dict, see normalizeTimes
+
+        Returns:
+            An (offset, mask) tuple. Bit i of mask stands for minute offset + i 
+            of the week
+        """
+        spans = [((day - 1) * minutesPerDay + toMinutes(start),
+                  (day - 1) * minutesPerDay + toMinutes(end))
+                 for day, meetings in times.items() for start, end in meetings]
+        if not spans:
+            return 0, 0
+
+        offset = min(start for start, end in spans)
+        mask = 0
+        for start, end in spans:
+            mask |= ((1 << (end - start + 1)) - 1) << (start - offset)
+        return offset, mask
+
+    def meetings(self):
+        """
+        Every meeting of the course as (day, start, end) tuples, in order through
+        the week
+        """
+        return self.meetingList
+
+    def key(self):
+        """
+        A tuple that uniquely identifies the course by its name and meeting times.
+        Courses are hashed, compared and sorted by this key, so they can be stored
+        in sets and schedules can be deduplicated without linear scans
+        """
+        return self.ident
+
+    def __eq__(self, other):
+        if not isinstance(other, Course):
+            return NotImplemented
+        return self.ident == other.ident
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __lt__(self, other):
+        if not isinstance(other, Course):
+            return NotImplemented
+        return self.ident < other.ident
+
+    def __hash__(self):
+        return hash(self.ident)
+
+    def printCourse(self):
+        """
+        Nothing to see here, just a nice debugging tool :)
+        """
+        print(self.name)
+        for day, start, end in self.meetings():
+            print(self.numToDay[day], (start, end))
+        print()
+
+    def valid(self, otherCourse):
+        """
+        Compares date/times for two courses to see if they conflict
+
+        Args:
+            otherCourse: another course object to compare to
+        
+        Returns:
+            boolean of whether the classes can be placed together or not
+        """
+        if self.name == otherCourse.name:
+            return False
+        # Line the later starting mask up with the earlier one. Minutes of the
+        # earlier course before the later one starts can't clash, so they are
+        # shifted away rather than shifting the other mask up
+        shift = otherCourse.maskOffset - self.maskOffset
+        if shift >= 0:
+            return not self.mask >> shift & otherCourse.mask
+        return not otherCourse.mask >> -shift & self.mask
@@ -0,0 +1,106 @@
+"""
+Keeps a solved set of schedules up to date as sections are added and removed,
+without searching everything again. A new section can only appear in schedules
+that include it, so only those are searched for, and a removed section only
+takes away the schedules that included it, so those are filtered out
+"""
+
+from schedengine.solver import CoursePool, iterSchedulesWith, iterSchedules
+
+
+class IncrementalSolver(object):
+    """
+    The courses, required course count and every schedule found from them so far.
+    The search methods are generators that add to weeks as they go, so weeks is
+    only complete once they have been run to the end
+    """
+
+    def __init__(self, courses, numCourses, weeks=None):
+        """
+        Args:
+            courses: A list of Course objects
+            numCourses: The number of courses each schedule must contain
+            weeks: Schedules already known to be the complete result for these
+                courses (ex: from a ScheduleCache). If given, solve() isn't needed
+        """
+        self.pool = CoursePool(courses)
+        self.numCourses = numCourses
+        self.weeks = list(weeks) if weeks is not None else []
+
+    @property
+    def courses(self):
+        return self.pool.courses
+
+    def solve(self, progress=None):
+        """
+        Runs the full search, replacing weeks
+
+        Args:
+            progress: An optional SearchProgress to report to and take cancellation from
+
+        Yields:
+            Lists of Course objects, one per valid weekly schedule
+        """
+        self.weeks = []
+        for week in iterSchedules(self.pool, self.numCourses, progress):
+            self.weeks.append(week)
+            yield week
+
+    def add(self, course, progress=None):
+        """
+        Adds a section and searches only for the schedules that include it
+
+        Args:
+            course: A Course object. Adding one that is already there does nothing
+            progress: An optional SearchProgress to report to and take cancellation from
+
+        Yields:
+            The new schedules, each one a list of Course objects
+        """
+        if course in self.pool.courses:
+            return
+
+        self.pool.add(course)
+        for week in iterSchedulesWith(self.pool, self.numCourses, course, progress):
+            self.weeks.append(week)
+            yield week
+
+    def remove(self, course):
+        """
+        Removes a section along with every schedule that included it
+
+        Args:
+            course: A Course object. Removing one that isn't there does nothing
+
+        Returns:
+            The number of schedules removed
+        """
+        if course not in self.pool.courses:
+            return 0
+
+        self.pool.remove(course)
+        before = len(self.weeks)
+        self.weeks = [week for week in self.weeks if course not in week]
+        return before - len(self.weeks)
+
+    def update(self, courses, progress=None):
+        """
+        Brings the solver in line with a new course list, removing whatever is gone
+        and adding whatever is new
+
+        Args:
+            courses: The full list of Course objects that should now be in the pool
+            progress: An optional SearchProgress to report to and take cancellation from
+
+        Yields:
+            The new schedules, each one a list of Course objects. Schedules that
+            were removed have already been dropped from weeks by the time the
+            first one is yielded
+        """
+        wanted = set(courses)
+        for course in [course for course in self.pool.courses if course not in wanted]:
+            self.remove(course)
+
+        for course in courses:
+            for week in self.add(course, progress):
+                yield week
@@ -0,0 +1,191 @@
+"""
+Stores generated schedules compactly and answers filter queries over them
+("Fridays free, nothing before 10:00, includes this section") without looking at
+every schedule. Schedules are rows of section indices in one flat array, each
+with a few summary features kept in their own arrays, and inverted indexes map
+sections, free days and first/last class times to the schedules that have them
+"""
+
+from array import array
+
+from schedengine.course import toMinutes
+
+allDays = range(1, 8)
+
+
+class ScheduleIndex(object):
+    """
+    A columnar, append-only store of schedules. Schedule n is the n-th one added,
+    and query returns schedule numbers, which week() turns back into courses
+    """
+
+    def __init__(self, weeks=()):
+        """
+        Args:
+            weeks: Schedules to start with, each one a list of Course objects
+        """
+        self.sections = []
+        self.sectionIndex = {}
+
+        # Per-section meetings in minutes, days as a bitmask, first start, last end
+        self.sectionInfo = []
+
+        # One row of section indices per schedule, and where each row starts
+        self.columns = array('I')
+        self.offsets = array('I', [0])
+
+        # Per-schedule features. Days are bits 1-7 of freeDays, times are minutes
+        self.freeDays = array('B')
+        self.firstStart = array('H')
+        self.lastEnd = array('H')
+        self.gapMinutes = array('I')
+
+        # Inverted indexes, each from a key to the ascending schedule numbers with it
+        self.bySection = {}
+        self.byFreeDay = {}
+        self.byFirstStart = {}
+        self.byLastEnd = {}
+
+        self.extend(weeks)
+
+    def __len__(self):
+        return len(self.freeDays)
+
+    def sectionNumber(self, course):
+        """
+        The index of a section in the section table, adding it if it's new
+        """
+        number = self.sectionIndex.get(course)
+        if number is None:
+            number = self.sectionIndex[course] = len(self.sections)
+            self.sections.append(course)
+            meetings = [(day, toMinutes(start), toMinutes(end))
+                        for day, start, end in course.meetings()]
+            self.sectionInfo.append((meetings, sum(1 << day for day in course.times),
+                                     min(start for day, start, end in meetings),
+                                     max(end for day, start, end in meetings)))
+        return number
+
+    def add(self, week):
+        """
+        Adds a schedule
+
+        Args:
+            week: A list of non-conflicting Course objects
+
+        Returns:
+            The new schedule's number
+        """
+        number = len(self)
+        byDay = {}
+        busyDays, first, last = 0, 1 << 16, 0
+        for course in week:
+            section = self.sectionNumber(course)
+            self.columns.append(section)
+            self.bySection.setdefault(section, array('I')).append(number)
+            meetings, days, sectionFirst, sectionLast = self.sectionInfo[section]
+            busyDays |= days
+            first = min(first, sectionFirst)
+            last = max(last, sectionLast)
+            for day, start, end in meetings:
+                byDay.setdefault(day, []).append((start, end))
+        self.offsets.append(len(self.columns))
+
+        freeDays = 0
+        for day in allDays:
+            if not busyDays >> day & 1:
+                freeDays |= 1 << day
+                self.byFreeDay.setdefault(day, array('I')).append(number)
+
+        if not week:
+            first = 0
+        gaps = 0
+        for meetings in byDay.values():
+            if len(meetings) > 1:
+                meetings.sort()
+                for i in range(1, len(meetings)):
+                    gaps += max(0, meetings[i][0] - meetings[i - 1][1])
+
+        self.freeDays.append(freeDays)
+        self.firstStart.append(first)
+        self.lastEnd.append(last)
+        self.gapMinutes.append(gaps)
+        self.byFirstStart.setdefault(first, array('I')).append(number)
+        self.byLastEnd.setdefault(last, array('I')).append(number)
+        return number
+
+    def extend(self, weeks):
+        for week in weeks:
+            self.add(week)
+
+    def week(self, number):
+        """
+        Rebuilds a schedule from its row
+
+        Returns:
+            A list of Course objects
+        """
+        return [self.sections[section]
+                for section in self.columns[self.offsets[number]:self.offsets[number + 1]]]
+
+    def query(self, freeDays=(), earliest=None, latest=None, includes=(), maxGap=None, start=0):
+        """
+        Finds the schedules matching every given filter. The most selective indexed
+        filter picks the candidates, and the rest are checked against the feature
+        columns, so a narrow query never touches most of the schedules
+
+        Args:
+            freeDays: Day numbers (1 = Monday) that must have no classes
+            earliest: A military time (ex: 1000) that no class may start before
+            latest: A military time (ex: 1700) that no class may end after
+            includes: Course objects that must all be in the schedule
+            maxGap: The most minutes between classes allowed across the week
+            start: Only schedules numbered this or higher are considered, so a
+                growing index can be queried for just what was added
+
+        Returns:
+            A list of schedule numbers, in ascending order
+        """
+        earliest = None if earliest is None else toMinutes(earliest)
+        latest = None if latest is None else toMinutes(latest)
+
+        sections = []
+        for course in includes:
+            if course not in self.sectionIndex:
+                return []
+            sections.append(self.sectionIndex[course])
+        dayMask = sum(1 << day for day in freeDays)
+
+        # Each indexed filter, as the posting lists whose union it matches
+        sources = [[self.bySection.get(section, ())] for section in sections]
+        sources += [[self.byFreeDay.get(day, ())] for day in freeDays]
+        if earliest is not None:
+            sources.append([numbers for time, numbers in self.byFirstStart.items()
+                            if time >= earliest])
+        if latest is not None:
+            sources.append([numbers for time, numbers in self.byLastEnd.items()
+                            if time <= latest])
+
+        if sources:
+            smallest = min(sources, key=lambda lists: sum(len(numbers) for numbers in lists))
+            candidates = sorted(number for numbers in smallest for number in numbers
+                                if number >= start)
+        else:
+            candidates = range(start, len(self))
+
+        matches = []
+        for number in candidates:
+            if self.freeDays[number] & dayMask != dayMask:
+                continue
+            if earliest is not None and self.firstStart[number] < earliest:
+                continue
+            if latest is not None and self.lastEnd[number] > latest:
+                continue
+            if maxGap is not None and self.gapMinutes[number] > maxGap:
+                continue
+            if sections:
+                row = self.columns[self.offsets[number]:self.offsets[number + 1]]
+                if not all(section in row for section in sections):
+                    continue
+            matches.append(number)
+        return matches
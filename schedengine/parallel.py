@@ -0,0 +1,125 @@
+"""
+Spreads the backtracking search across CPU cores. The top of the search tree is
+split into independent subtrees (one for each way of filling in the first few
+courses), and each subtree is searched by a worker process
+"""
+
+from schedengine.solver import CoursePool, iterMatches
+
+# The pool each worker process searches, set once per process by initWorker so
+# that the courses are not pickled over again for every task
+workerPool = None
+workerIndex = None
+
+
+def splitSearch(pool, numCourses, depth):
+    """
+    Walks the first depth levels of the search tree the same way iterMatches does,
+    and returns the nodes it stops at. Searching below each of these nodes covers
+    the whole tree exactly once, in the same order a single search would
+
+    Args:
+        pool: A CoursePool containing the possible courses
+        numCourses: The number of courses each schedule must contain
+        depth: How many course names to fill in (or skip) before splitting
+
+    Returns:
+        A list of (group, chosen section indices, candidates) tuples
+    """
+    tasks = []
+
+    def walk(group, chosen, candidates):
+        remaining = len(pool.groups) - group
+        needed = numCourses - len(chosen)
+        if remaining < needed:
+            return
+        if group == depth or needed == 0:
+            tasks.append((group, tuple(chosen), candidates))
+            return
+
+        for index in pool.groups[group]:
+            if candidates >> index & 1:
+                chosen.append(index)
+                walk(group + 1, chosen, candidates & pool.compatible[index])
+                chosen.pop()
+
+        if remaining > needed:
+            walk(group + 1, chosen, candidates)
+
+    walk(0, [], (1 << len(pool.courses)) - 1)
+    return tasks
+
+
+def initWorker(pool):
+    """
+    Runs once in each worker process to hold onto the shared CoursePool
+    """
+    global workerPool, workerIndex
+    workerPool = pool
+    workerIndex = dict((course, i) for i, course in enumerate(pool.courses))
+
+
+def searchTask(task):
+    """
+    Searches one subtree in a worker process
+
+    Args:
+        task: A (group, chosen section indices, candidates, numCourses) tuple
+
+    Returns:
+        A list of schedules as tuples of section indices, which are far cheaper to
+        send back to the parent process than Course objects
+    """
+    group, chosen, candidates, numCourses = task
+    chosenCourses = [workerPool.courses[index] for index in chosen]
+    return [tuple(workerIndex[course] for course in week)
+            for week in iterMatches(workerPool, group, chosenCourses, candidates, numCourses)]
+
+
+def parallelSchedules(courses, numCourses, processes=None, ordered=True, depth=None):
+    """
+    The multi-process version of iterSchedules. Yields the same schedules, with
+    the search spread across a pool of worker processes
+
+    Args:
+        courses: A list of Course objects, or a CoursePool
+        numCourses: The number of courses each schedule must contain
+        processes: How many worker processes to use. Defaults to the CPU count
+        ordered: If True, schedules come out in exactly the same order as
+            iterSchedules. If False, they come out as soon as a worker is done 
+            with them, which keeps every core busy but is not deterministic
+        depth: How many course names to fill in before splitting up the work. By
+            default, it is deepened until there are a few tasks per process
+
+    Yields:
+        Lists of Course objects, one per valid weekly schedule
+    """
+    # multiprocessing is slow to import, and most users of the engine never need
+    # it, so it is only pulled in here
+    import multiprocessing
+
+    pool = courses if isinstance(courses, CoursePool) else CoursePool(courses)
+    processes = processes or multiprocessing.cpu_count()
+
+    if depth is None:
+        depth = 1
+        tasks = splitSearch(pool, numCourses, depth)
+        while len(tasks) < processes * 4 and depth < len(pool.groups):
+            depth += 1
+            tasks = splitSearch(pool, numCourses, depth)
+    else:
+        tasks = splitSearch(pool, numCourses, depth)
+
+    tasks = [task + (numCourses,) for task in tasks]
+    workers = multiprocessing.Pool(processes, initWorker, (pool,))
+    try:
+        results = workers.imap(searchTask, tasks) if ordered else \
+                workers.imap_unordered(searchTask, tasks)
+        for weeks in results:
+            for week in weeks:
+                yield [pool.courses[index] for index in week]
+        workers.close()
+    finally:
+        # Stopping early (or an error) shouldn't leave processes lying around
+        workers.terminate()
+        workers.join()
@@ -0,0 +1,108 @@
+"""
+Turns the formatted course strings used by the GUI's schedule list (and by 
+course files) into Course objects
+"""
+
+import re
+
+from schedengine.course import Course
+
+weekdayDict = {'M':1, 'T':2, 'W':3, 'R':4, 'F':5, 'S':6, 'U':7}
+
+# One meeting, ex: M9:30-10:20. Saturday is S and Sunday is U. Older versions of
+# the GUI didn't zero pad minutes, so 9:5 is 9:05
+meetingPattern = re.compile(r'([MTWRFSU])(\d{1,2}):(\d{1,2})-(\d{1,2}):(\d{1,2})$')
+
+# Parsed courses, keyed by the exact string they came from. Courses are read-only,
+# so the same object can be handed out every time a string is seen again
+parseCache = {}
+maxCacheSize = 100000
+
+
+def parseTime(hour, minute, text):
+    """
+    Turns an hour and minute string into an integer military time, ex: 930
+    """
+    hour = int(hour)
+    minute = int(minute)
+    if hour > 23 or minute > 59:
+        raise ValueError('Invalid time in %r' % text)
+    return hour * 100 + minute
+
+
+def parseCourse(text):
+    """
+    Parses a single formatted class string into a Course object. Results are
+    cached, so parsing the same string again is a dict lookup
+
+    Args:
+        text: Course code, then days and times space separated
+            ex: COP3502 M9:30-10:20 W9:30-10:20
+            A day can be listed more than once for courses that meet more than
+            once on it, ex: BSC2010 M9:30-10:20 M14:00-16:50
+
+    Returns:
+        A Course object with the class information from text
+
+    Raises:
+        ValueError: if text is not in the expected format
+    """
+    course = parseCache.get(text)
+    if course is not None:
+        return course
+
+    splitStr = text.split()
+    if len(splitStr) < 2:
+        raise ValueError('Expected a course name and at least one meeting: %r' % text)
+
+    times = {}
+    for courseTime in splitStr[1:]:
+        match = meetingPattern.match(courseTime)
+        if match is None:
+            raise ValueError('Invalid meeting %r in %r' % (courseTime, text))
+
+        day, startHour, startMinute, endHour, endMinute = match.groups()
+        startTime = parseTime(startHour, startMinute, text)
+        endTime = parseTime(endHour, endMinute, text)
+        times.setdefault(weekdayDict[day], []).append((startTime, endTime))
+
+    try:
+        course = Course(times, splitStr[0])
+    except ValueError as e:
+        raise ValueError('%s in %r' % (e, text))
+    if len(parseCache) >= maxCacheSize:
+        parseCache.clear()
+    parseCache[text] = course
+    return course
+
+
+def importClasses(classes):
+    """
+    Takes a list of formatted class strings and turns them into 'Course' objects.
+
+    Args:
+        classes[]: list of strings. Course code, then days and times space separated
+        ex: COP3502 M9:30-10:20 W9:30-10:20
+
+    Returns:
+        A list of Course objects that have the class information from classes
+
+    Raises:
+        ValueError: if any of the strings are not in the expected format
+    """
+    return [parseCourse(course) for course in classes]
+
+
+def formatCourse(course):
+    """
+    The reverse of parseCourse, turning a Course back into its formatted string
+
+    Args:
+        course: A Course object
+
+    Returns:
+        A string like COP3502 M9:30-10:20 W9:30-10:20
+    """
+    meetings = ['%s%d:%02d-%d:%02d' %(Course.numToDay[day], start // 100, start % 100, 
+                end // 100, end % 100) for day, start, end in course.meetings()]
+    return ' '.join([course.name] + meetings)
@@ -0,0 +1,221 @@
+"""
+Scores schedules against the user's preferences and finds the best few of them
+with a branch-and-bound search, without enumerating every valid schedule
+"""
+
+import heapq
+
+from schedengine.course import toMinutes
+from schedengine.solver import CoursePool
+
+
+def countBits(bits):
+    return bin(bits).count('1')
+
+
+class Objectives(object):
+    """
+    The weights that make up a schedule's cost. Lower costs are better. Every term
+    except for gaps is tied to individual sections or days, which is what lets 
+    topSchedules bound the cost of a partial schedule
+    """
+
+    def __init__(self, gapWeight=1, dayWeight=0, earliest=None, earlyWeight=1,
+                 latest=None, lateWeight=1, preferred=(), preferWeight=60):
+        """
+        Args:
+            gapWeight: The cost of each minute spent waiting between classes
+            dayWeight: The cost of each day that has to be spent on campus
+            earliest: A military time (ex: 1000) that classes should not start before
+            earlyWeight: The cost of each minute a meeting starts before earliest
+            latest: A military time (ex: 1700) that classes should not end after
+            lateWeight: The cost of each minute a meeting ends after latest
+            preferred: Course objects the user has pinned. Picking any other 
+                section of a pinned course costs preferWeight
+            preferWeight: See preferred
+        """
+        self.gapWeight = gapWeight
+        self.dayWeight = dayWeight
+        self.earliest = None if earliest is None else toMinutes(earliest)
+        self.earlyWeight = earlyWeight
+        self.latest = None if latest is None else toMinutes(latest)
+        self.lateWeight = lateWeight
+        self.preferred = set(preferred)
+        self.preferredNames = set(course.name for course in self.preferred)
+        self.preferWeight = preferWeight
+
+    def sectionCost(self, course):
+        """
+        The part of the cost that a section brings along no matter what else is in
+        the schedule with it
+
+        Args:
+            course: A Course object
+
+        Returns:
+            The section's cost
+        """
+        cost = 0
+        for day, start, end in course.meetings():
+            if self.earliest is not None:
+                cost += self.earlyWeight * max(0, self.earliest - toMinutes(start))
+            if self.latest is not None:
+                cost += self.lateWeight * max(0, toMinutes(end) - self.latest)
+
+        if course.name in self.preferredNames and course not in self.preferred:
+            cost += self.preferWeight
+        return cost
+
+    def gapMinutes(self, week):
+        """
+        The total number of minutes spent between classes across the whole week
+
+        Args:
+            week: A list of non-conflicting Course objects
+
+        Returns:
+            The number of minutes in gaps
+        """
+        byDay = {}
+        for course in week:
+            for day, start, end in course.meetings():
+                byDay.setdefault(day, []).append((toMinutes(start), toMinutes(end)))
+
+        gaps = 0
+        for meetings in byDay.values():
+            meetings.sort()
+            for i in range(1, len(meetings)):
+                gaps += max(0, meetings[i][0] - meetings[i - 1][1])
+        return gaps
+
+    def cost(self, week):
+        """
+        Scores a full schedule
+
+        Args:
+            week: A list of non-conflicting Course objects
+
+        Returns:
+            The schedule's cost. Lower is better
+        """
+        days = set()
+        for course in week:
+            days.update(course.times)
+
+        return self.dayWeight * len(days) + self.gapWeight * self.gapMinutes(week) + \
+                sum(self.sectionCost(course) for course in week)
+
+
+def topSchedules(courses, numCourses, k=20, objectives=None, progress=None):
+    """
+    Finds the k lowest cost schedules. The k best found so far are kept in a
+    bounded heap, and any branch of the search whose cost can't possibly beat the
+    worst of them is cut off.
+
+    To get a useful bound, a day's gaps are rewritten as its span (first start to
+    last end) minus the minutes spent in class. Spans and days on campus can only
+    grow as classes are added, and the minutes in class belong to individual
+    sections, so the bound for a partial schedule is its current spans and days,
+    plus what has been picked so far, plus the cheapest section still available
+    from each course that has yet to be filled in
+
+    Args:
+        courses: A list of Course objects, or a CoursePool
+        numCourses: The number of courses each schedule must contain
+        k: How many schedules to return
+        objectives: An Objectives object. By default, gaps are minimised
+        progress: An optional SearchProgress to report to and take cancellation from.
+            A cancelled search returns the best schedules it had found so far
+
+    Returns:
+        A list of up to k (cost, schedule) tuples, best first
+    """
+    pool = courses if isinstance(courses, CoursePool) else CoursePool(courses)
+    objectives = objectives or Objectives()
+    if k <= 0 or numCourses < 0:
+        return []
+
+    # Each section's own cost, less the class minutes it takes out of the gaps
+    sectionCosts = []
+    meetings = []
+    for course in pool.courses:
+        times = [(day, toMinutes(start), toMinutes(end)) for day, start, end in course.meetings()]
+        classMinutes = sum(end - start for day, start, end in times)
+        sectionCosts.append(objectives.sectionCost(course) - objectives.gapWeight * classMinutes)
+        meetings.append(times)
+    dayMasks = [sum(1 << day for day in course.times) for course in pool.courses]
+
+    # Trying the cheapest sections first finds good schedules early, which makes 
+    # the bound bite sooner. It also means the first candidate section of a group
+    # is always its cheapest
+    groups = [sorted(group, key=sectionCosts.__getitem__) for group in pool.groups]
+
+    # A max-heap (by negated cost) of the best schedules so far. The counter keeps
+    # ties from ever comparing the schedules themselves
+    best = []
+    counter = [0]
+
+    def addSpans(spans, index):
+        """
+        Stretches the per-day (first start, last end) spans to cover a section,
+        returning the new spans along with how many minutes they grew by
+        """
+        spans = dict(spans)
+        growth = 0
+        for day, start, end in meetings[index]:
+            first, last = spans.get(day, (start, end))
+            newFirst, newLast = min(first, start), max(last, end)
+            growth += (newLast - newFirst) - (last - first if day in spans else 0)
+            spans[day] = (newFirst, newLast)
+        return spans, growth
+
+    def search(group, chosen, candidates, days, spans, spanMinutes, partial):
+        if progress is not None:
+            if progress.cancelled:
+                return
+            progress.nodes += 1
+
+        fixed = objectives.dayWeight * countBits(days) + objectives.gapWeight * spanMinutes + partial
+
+        needed = numCourses - len(chosen)
+        if needed == 0:
+            counter[0] += 1
+            if progress is not None:
+                progress.found += 1
+            if len(best) < k:
+                heapq.heappush(best, (-fixed, -counter[0], list(chosen)))
+            elif fixed < -best[0][0]:
+                heapq.heapreplace(best, (-fixed, -counter[0], list(chosen)))
+            return
+
+        cheapest = []
+        for remaining in groups[group:]:
+            for index in remaining:
+                if candidates >> index & 1:
+                    cheapest.append(sectionCosts[index])
+                    break
+
+        # Not enough courses left with an open section to fill the schedule
+        if len(cheapest) < needed:
+            return
+
+        if len(best) == k:
+            cheapest.sort()
+            if fixed + sum(cheapest[:needed]) >= -best[0][0]:
+                return
+
+        for index in groups[group]:
+            if candidates >> index & 1:
+                chosen.append(pool.courses[index])
+                newSpans, growth = addSpans(spans, index)
+                search(group + 1, chosen, candidates & pool.compatible[index],
+                       days | dayMasks[index], newSpans, spanMinutes + growth,
+                       partial + sectionCosts[index])
+                chosen.pop()
+
+        # Only leave this course out entirely if the rest can still fill the schedule
+        if len(groups) - group > needed:
+            search(group + 1, chosen, candidates, days, spans, spanMinutes, partial)
+
+    search(0, [], (1 << len(pool.courses)) - 1, 0, {}, 0, 0)
+    return [(-cost, week) for cost, order, week in sorted(best, reverse=True)]
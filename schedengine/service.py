@@ -0,0 +1,509 @@
+"""
+A small local scheduling service, so that one machine can answer schedule
+requests for many users (ex: an advising office during registration week)
+without each of them importing and solving the catalog themselves.
+
+The catalog is loaded and its conflicts precomputed once, at startup. Each
+worker process is handed that CoursePool once as well, and requests only pick
+which course names to search. Requests that arrive close together are sent to
+the workers in batches, identical requests in flight are only solved once, and
+results are kept in an LRU cache.
+
+    python -m schedengine.service catalog.csv --port 8765
+    python -m schedengine.service catalog.csv --socket /tmp/scheduler.sock
+
+    POST /schedules  {"courses": ["COP3502", "MAC2311"], "count": 2, "limit": 50}
+    GET  /courses
+    GET  /stats
+
+Only the standard library is used, and it speaks plain HTTP over TCP or a Unix
+socket.
+"""
+
+from __future__ import print_function
+
+import argparse
+import copy
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn, UnixStreamServer
+    from queue import Queue, Empty
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn, UnixStreamServer
+    from Queue import Queue, Empty
+
+from schedengine.catalog import loadCatalog, sectionRecord
+from schedengine.count import countSchedules
+from schedengine.ranking import topSchedules
+from schedengine.solver import CoursePool, SearchProgress, clock, iterSchedules
+
+# The catalog's CoursePool in each worker process, set once by initWorker
+workerPool = None
+workerIndex = None
+
+
+def focusPool(pool, names):
+    """
+    A view of the pool that only searches the given course names. The pool's
+    precomputed compatibility bitsets are shared, not rebuilt
+
+    Args:
+        pool: A CoursePool of the whole catalog
+        names: A collection of course names
+
+    Returns:
+        A shallow copy of pool with only those names' groups
+    """
+    focused = copy.copy(pool)
+    focused.groups = [group for group in pool.groups if pool.courses[group[0]].name in names]
+    return focused
+
+
+def initWorker(pool):
+    """
+    Runs once in each worker process to hold onto the catalog's CoursePool
+    """
+    global workerPool, workerIndex
+
+    # Ctrl-C reaches the whole process group, but shutting the workers down is
+    # the parent's job
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    workerPool = pool
+    workerIndex = dict((course, i) for i, course in enumerate(pool.courses))
+
+
+class SearchBudget(SearchProgress):
+    """
+    A SearchProgress that cancels itself once the search has run for too long, so
+    one heavy request can't hold onto a worker process indefinitely
+    """
+
+    def __init__(self, seconds):
+        self.deadline = clock() + seconds
+        super(SearchBudget, self).__init__()
+
+    @property
+    def cancelled(self):
+        if not self.stopped and clock() > self.deadline:
+            self.stopped = True
+        return self.stopped
+
+    @cancelled.setter
+    def cancelled(self, value):
+        self.stopped = value
+
+
+def solveRequest(names, numCourses, maxSchedules, topCount, searchTime):
+    """
+    Solves one request against workerPool. Results known to have at most
+    maxSchedules schedules are listed in full. Anything bigger, or whose count is
+    only an estimate (which can be far too low), is ranked for the best topCount.
+    Either search gives up after searchTime seconds
+
+    Returns:
+        A (count, exact, ranked, complete, schedules) tuple, with schedules as
+        tuples of indices into the catalog's pool. complete is False if the time
+        ran out, in which case schedules is only what was found by then
+    """
+    pool = focusPool(workerPool, names)
+    progress = SearchBudget(searchTime)
+    count, exact = countSchedules(pool, numCourses)
+    ranked = not exact or count > maxSchedules
+    if ranked:
+        weeks = [week for cost, week in topSchedules(pool, numCourses, topCount, progress=progress)]
+    else:
+        weeks = list(iterSchedules(pool, numCourses, progress))
+    return count, exact, ranked, not progress.cancelled, \
+            [tuple(workerIndex[course] for course in week) for week in weeks]
+
+
+def solveBatch(requests):
+    """
+    Solves a batch of requests in a worker process, so that requests arriving
+    together only pay for one round trip. A request that fails doesn't take the
+    rest of its batch down with it
+
+    Args:
+        requests: A list of (names, numCourses, maxSchedules, topCount,
+            searchTime) tuples
+
+    Returns:
+        A list of (result, error) tuples, in the same order. result is what
+        solveRequest returned, or None if it raised, in which case error is the
+        message
+    """
+    results = []
+    for request in requests:
+        try:
+            results.append((solveRequest(*request), None))
+        except Exception as e:
+            results.append((None, '%s: %s' % (type(e).__name__, e)))
+    return results
+
+
+class WorkerError(Exception):
+    """
+    A worker raised while solving a request. Unlike a timeout or a shutdown,
+    which raise RuntimeError, asking again won't help
+    """
+
+
+class PendingRequest(object):
+    """
+    A request waiting on a worker. Every caller asking for the same thing while
+    it is in flight waits on the same one
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def finish(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.done.set()
+
+    def wait(self, timeout=None):
+        if not self.done.wait(timeout):
+            raise RuntimeError('Timed out waiting for a worker')
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SchedulingService(object):
+    """
+    Holds the catalog, the worker processes, the result cache and the requests in
+    flight. solve is safe to call from many threads at once
+    """
+
+    def __init__(self, courses, processes=None, cacheEntries=1024, maxSchedules=1000,
+                 topCount=200, batchSize=16, batchWindow=0.005, searchTime=3):
+        """
+        Args:
+            courses: A list of Course objects, usually a whole catalog
+            processes: How many worker processes to use. Defaults to the CPU count
+            cacheEntries: How many results to keep in memory
+            maxSchedules: The most schedules a result lists in full. Requests with
+                more than this are answered with the best topCount instead
+            topCount: See maxSchedules
+            batchSize: The most requests sent to a worker at once
+            batchWindow: How many seconds to wait for more requests to batch up
+            searchTime: The most seconds a worker spends searching for one request.
+                A batch is solved one request after another, so batchSize times
+                this should stay under the time callers are willing to wait
+        """
+        self.pool = CoursePool(courses)
+        self.names = set(course.name for course in self.pool.courses)
+        self.processes = processes
+        self.cacheEntries = cacheEntries
+        self.maxSchedules = maxSchedules
+        self.topCount = topCount
+        self.batchSize = batchSize
+        self.batchWindow = batchWindow
+        self.searchTime = searchTime
+
+        self.cache = OrderedDict()
+        self.inFlight = {}
+        self.lock = threading.Lock()
+        self.queue = Queue()
+        self.counters = {'requests': 0, 'cache hits': 0, 'joined': 0, 'solved': 0, 'batches': 0}
+        self.workers = None
+        self.workerCount = 0
+        self.dispatcher = None
+
+    def start(self):
+        """
+        Starts the worker processes and the thread that batches requests for them
+        """
+        # multiprocessing is slow to import, see parallelSchedules
+        import multiprocessing
+
+        self.workerCount = self.processes or multiprocessing.cpu_count()
+        self.workers = multiprocessing.Pool(self.workerCount, initWorker, (self.pool,))
+        self.dispatcher = threading.Thread(target=self.dispatch)
+        self.dispatcher.daemon = True
+        self.dispatcher.start()
+
+    def close(self):
+        """
+        Stops the workers. Requests still waiting are failed
+        """
+        self.queue.put(None)
+        if self.workers is not None:
+            self.workers.terminate()
+            self.workers.join()
+        with self.lock:
+            for pending in self.inFlight.values():
+                pending.finish(error=RuntimeError('The service was shut down'))
+            self.inFlight.clear()
+
+    def courseList(self):
+        """
+        Every course name in the catalog along with how many sections it has
+        """
+        return dict((self.pool.courses[group[0]].name, len(group)) for group in self.pool.groups)
+
+    def solve(self, names, numCourses=None, timeout=None):
+        """
+        Answers a request, from the cache if possible
+
+        Args:
+            names: The course names to build schedules from
+            numCourses: The number of courses each schedule must contain. Defaults
+                to all of them
+            timeout: How many seconds to wait for a worker, or None to wait forever
+
+        Returns:
+            A (count, exact, ranked, complete, weeks) tuple. count is the total
+            number of valid schedules (estimated unless exact), and weeks lists
+            every one of them, or only the best few if ranked is True. complete is
+            False if the search ran out of time, and weeks is what it had found
+
+        Raises:
+            ValueError: if a course name isn't in the catalog, or numCourses isn't
+                a whole number between 0 and the number of names
+            WorkerError: if the worker solving the request failed
+            RuntimeError: if no worker answered within timeout, or the service
+                was shut down
+        """
+        unknown = sorted(set(names) - self.names)
+        if unknown:
+            raise ValueError('Unknown courses: %s' % ', '.join(unknown))
+        if numCourses is None:
+            numCourses = len(set(names))
+        if not isinstance(numCourses, int) or isinstance(numCourses, bool) or \
+                not 0 <= numCourses <= len(set(names)):
+            raise ValueError('count must be a whole number from 0 to %d' % len(set(names)))
+        key = (tuple(sorted(set(names))), numCourses)
+
+        with self.lock:
+            self.counters['requests'] += 1
+            result = self.cache.pop(key, None)
+            if result is not None:
+                # Reinserting moves it to the most recently used end
+                self.cache[key] = result
+                self.counters['cache hits'] += 1
+                pending = None
+            elif key in self.inFlight:
+                self.counters['joined'] += 1
+                pending = self.inFlight[key]
+            else:
+                pending = self.inFlight[key] = PendingRequest()
+                self.queue.put(key)
+
+        if pending is not None:
+            if not pending.done.wait(timeout):
+                # The worker it was sent to may be gone for good, so the next
+                # request for the same thing gets sent again rather than joining it
+                with self.lock:
+                    if self.inFlight.get(key) is pending:
+                        del self.inFlight[key]
+                raise RuntimeError('Timed out waiting for a worker')
+            result = pending.wait()
+
+        count, exact, ranked, complete, weeks = result
+        return count, exact, ranked, complete, [[self.pool.courses[index] for index in week]
+                                                for week in weeks]
+
+    def dispatch(self):
+        """
+        The batching thread. Waits for a request, collects any more that arrive
+        within batchWindow (up to batchSize of them), and splits them evenly across
+        the workers, so that a burst of requests doesn't all queue up behind one
+        """
+        while True:
+            key = self.queue.get()
+            if key is None:
+                return
+            batch = [key]
+            deadline = time.time() + self.batchWindow
+            while len(batch) < self.batchSize:
+                try:
+                    key = self.queue.get(timeout=max(0, deadline - time.time()))
+                except Empty:
+                    break
+                if key is None:
+                    return
+                batch.append(key)
+
+            size = -(-len(batch) // self.workerCount)
+            for start in range(0, len(batch), size):
+                chunk = batch[start:start + size]
+                with self.lock:
+                    self.counters['batches'] += 1
+                requests = [(names, numCourses, self.maxSchedules, self.topCount, self.searchTime)
+                            for names, numCourses in chunk]
+
+                # solveBatch returns its errors rather than raising them, which is
+                # what lets this work without error_callback, which Python 2 lacks
+                self.workers.apply_async(solveBatch, (requests,),
+                                         callback=lambda results, chunk=chunk: self.finish(chunk, results))
+
+    def finish(self, batch, results):
+        """
+        Caches a finished batch and wakes up everyone waiting on it
+        """
+        with self.lock:
+            for key, (result, error) in zip(batch, results):
+                # Requests that timed out are no longer in flight, but anyone who
+                # has asked again since is still glad of the answer
+                pending = self.inFlight.pop(key, None)
+                if error is not None:
+                    if pending is not None:
+                        pending.finish(error=WorkerError(error))
+                    continue
+                self.counters['solved'] += 1
+                self.cache[key] = result
+                while len(self.cache) > self.cacheEntries:
+                    self.cache.popitem(last=False)
+                if pending is not None:
+                    pending.finish(result)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    The HTTP front end. The service is reached through self.server.service
+    """
+
+    # How many seconds a request waits for a worker before giving up with a 503
+    solveTimeout = 60
+
+    def address_string(self):
+        # Unix socket clients don't have a (host, port) address
+        return self.client_address[0] if self.client_address else 'local'
+
+    def sendJson(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/courses':
+            self.sendJson(200, service.courseList())
+        elif self.path == '/stats':
+            with service.lock:
+                self.sendJson(200, dict(service.counters, cached=len(service.cache)))
+        else:
+            self.sendJson(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if self.path != '/schedules':
+            self.sendJson(404, {'error': 'Not found'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            names = request['courses']
+            numCourses = request.get('count')
+            limit = request.get('limit')
+            if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or
+                                      limit < 0):
+                raise ValueError('limit must be a whole number of at least 0')
+
+            count, exact, ranked, complete, weeks = self.server.service.solve(
+                    names, numCourses, self.solveTimeout)
+            if limit is not None:
+                weeks = weeks[:limit]
+        except (ValueError, KeyError, TypeError) as e:
+            self.sendJson(400, {'error': str(e)})
+            return
+        except WorkerError as e:
+            self.sendJson(500, {'error': str(e)})
+            return
+        except RuntimeError as e:
+            # Timeouts and shutdowns, which are worth trying again later
+            self.sendJson(503, {'error': str(e)})
+            return
+        except Exception as e:
+            # Anything else is a bug, but the client should still get an answer
+            self.sendJson(500, {'error': '%s: %s' % (type(e).__name__, e)})
+            return
+
+        self.sendJson(200, {
+            'count': count,
+            'exact': exact,
+            'ranked': ranked,
+            'complete': complete,
+            'schedules': [{'schedule': number,
+                           'sections': [sectionRecord(course) for course in week]}
+                          for number, week in enumerate(weeks, 1)],
+        })
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    # The default backlog of 5 resets connections when a burst of users arrives
+    request_queue_size = 128
+
+
+class ThreadingUnixServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def buildParser():
+    parser = argparse.ArgumentParser(prog='python -m schedengine.service',
+                                     description='Serve schedule requests for a catalog')
+    parser.add_argument('catalog', help='course file (text, .csv or .jsonl)')
+    parser.add_argument('--input-format', choices=['text', 'csv', 'jsonl'],
+                        help='format of the course file, guessed from its extension by default')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='port to listen on (default: 8765)')
+    parser.add_argument('--socket', help='listen on this Unix socket instead of TCP')
+    parser.add_argument('-j', '--processes', type=int,
+                        help='number of worker processes (default: one per CPU)')
+    parser.add_argument('--cache', type=int, default=1024, help='results to keep in memory')
+    return parser
+
+
+def main(argv=None):
+    args = buildParser().parse_args(argv)
+
+    try:
+        courses = loadCatalog(args.catalog, args.input_format)
+    except (IOError, ValueError) as e:
+        print('%s: %s' % (args.catalog, e), file=sys.stderr)
+        return 1
+
+    service = SchedulingService(courses, args.processes, args.cache)
+    if args.socket:
+        server = ThreadingUnixServer(args.socket, RequestHandler)
+        where = args.socket
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), RequestHandler)
+        where = 'http://%s:%d' % (args.host, args.port)
+    server.service = service
+
+    service.start()
+    print('Serving %d sections on %s' % (len(service.pool.courses), where), file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket:
+            os.unlink(args.socket)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
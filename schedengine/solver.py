@@ -0,0 +1,461 @@
+"""
+The backtracking solver. Courses go in, weekly schedules (lists of Course
+objects) come out.
+"""
+
+import copy
+import time
+from contextlib import contextmanager
+
+# perf_counter is much finer grained, but Python 2 doesn't have it
+clock = getattr(time, 'perf_counter', time.time)
+
+
+def buildCompatibility(courses):
+    """
+    Compares every pair of courses once and records the results as bitsets, so the
+    search never has to call Course.valid itself
+
+    Args:
+        courses: A list of Course objects
+
+    Returns:
+        A list of ints, one per course. Bit j of entry i is set when courses[i] and
+        courses[j] can be placed in the same schedule
+    """
+    compatible = [0] * len(courses)
+
+    # valid() is symmetric, so only the upper triangle needs to be checked
+    for i in range(len(courses)):
+        for j in range(i + 1, len(courses)):
+            if courses[i].valid(courses[j]):
+                compatible[i] |= 1 << j
+                compatible[j] |= 1 << i
+    return compatible
+
+
+class CoursePool(object):
+    """
+    A list of courses along with their pairwise compatibility bitsets. The bitsets
+    are built once when the pool is created, so generating schedules from the same
+    pool over and over again only pays for the comparisons a single time. Adding
+    or removing a single course afterwards only touches that course's row
+    """
+
+    def __init__(self, courses, stats=None):
+        """
+        Args:
+            courses: A list of Course objects. Identical sections are only kept 
+                once, so that the same schedule can never be built twice
+            stats: An optional RunStats to record the 'conflicts' phase in
+        """
+        self.courses = []
+        seen = set()
+        for course in courses:
+            if course not in seen:
+                seen.add(course)
+                self.courses.append(course)
+
+        if stats is None:
+            self.compatible = buildCompatibility(self.courses)
+        else:
+            with stats.timer('conflicts'):
+                self.compatible = buildCompatibility(self.courses)
+            stats.count('valid calls', len(self.courses) * (len(self.courses) - 1) // 2)
+        self.groups = groupSections(self.courses)
+
+    def add(self, course):
+        """
+        Adds a course to the pool, comparing it against every course already there
+
+        Args:
+            course: A Course object
+
+        Returns:
+            The course's index in the pool. If an identical course was already in
+            the pool, nothing is added and that course's index is returned
+        """
+        if course in self.courses:
+            return self.courses.index(course)
+
+        index = len(self.courses)
+        row = 0
+        for i, other in enumerate(self.courses):
+            if course.valid(other):
+                row |= 1 << i
+                self.compatible[i] |= 1 << index
+        self.courses.append(course)
+        self.compatible.append(row)
+        self.groups = groupSections(self.courses)
+        return index
+
+    def remove(self, course):
+        """
+        Removes a course from the pool. Every course after it moves down an index,
+        so its bit is cut out of each bitset and the bits above it shifted down
+
+        Args:
+            course: A Course object in the pool
+
+        Raises:
+            ValueError: if the course is not in the pool
+        """
+        index = self.courses.index(course)
+        low = (1 << index) - 1
+        del self.courses[index]
+        del self.compatible[index]
+        self.compatible = [(bits & low) | ((bits >> (index + 1)) << index) 
+                           for bits in self.compatible]
+        self.groups = groupSections(self.courses)
+
+
+def groupSections(courses):
+    """
+    Groups the indices of courses by course name, since a schedule can only ever
+    hold one section of each course. Courses with the fewest sections come first so
+    that dead ends are found near the top of the search tree
+
+    Args:
+        courses: A list of Course objects
+
+    Returns:
+        A list of lists of indices into courses, one list per course name
+    """
+    groups = {}
+    order = []
+    for i, course in enumerate(courses):
+        if course.name not in groups:
+            groups[course.name] = []
+            order.append(course.name)
+        groups[course.name].append(i)
+    return sorted([groups[name] for name in order], key=len)
+
+
+class SearchProgress(object):
+    """
+    Shared between a running search and whoever is watching it (ex: the GUI thread).
+    The search bumps the counters as it goes and checks the cancelled flag at every
+    node, so a long search can be stopped even when it isn't finding anything
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.found = 0
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Asks the search to stop at the next node it visits
+        """
+        self.cancelled = True
+
+
+class RunStats(SearchProgress):
+    """
+    A SearchProgress that also keeps timers and counters for each phase of a run
+    (parse, conflicts, search, format, render). Instrumentation is opt-in: pass
+    one of these wherever a SearchProgress or stats object is taken, and time the
+    phases the engine doesn't run itself with timer()
+    """
+
+    phaseOrder = ['parse', 'conflicts', 'search', 'format', 'render']
+
+    def __init__(self):
+        super(RunStats, self).__init__()
+        self.times = {}
+        self.calls = {}
+        self.counters = {}
+
+    def addTime(self, phase, seconds):
+        self.times[phase] = self.times.get(phase, 0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    @contextmanager
+    def timer(self, phase):
+        """
+        Times the body of a with block, adding it to phase
+        """
+        start = clock()
+        try:
+            yield
+        finally:
+            self.addTime(phase, clock() - start)
+
+    def timed(self, phase, iterable):
+        """
+        Wraps an iterable so that only the time spent producing each item is added
+        to phase, not the time the consumer spends on it
+        """
+        iterator = iter(iterable)
+        while True:
+            start = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.addTime(phase, clock() - start)
+                return
+            self.addTime(phase, clock() - start)
+            yield item
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self):
+        """
+        A readable report of every phase and counter
+
+        Returns:
+            A list of lines
+        """
+        phases = [phase for phase in self.phaseOrder if phase in self.times] + \
+                sorted(phase for phase in self.times if phase not in self.phaseOrder)
+        lines = ['%-12s %10.2f ms  (%d calls)' % (phase, self.times[phase] * 1000, 
+                 self.calls[phase]) for phase in phases]
+        lines.append('%-12s %10d' % ('nodes', self.nodes))
+        lines.append('%-12s %10d' % ('schedules', self.found))
+        for name in sorted(self.counters):
+            lines.append('%-12s %10d' % (name, self.counters[name]))
+        return lines
+
+
+def iterMatches(pool, group, chosenCourses, candidates, numCourses, progress=None):
+    """
+    A backtracking algorithm that yields every valid schedule possible, given the
+    courses from the pool. Rather than trying every subset of courses, it walks
+    the course names one at a time and picks at most one section from each, so the
+    search is over the product of sections instead of the power set. Each
+    combination of sections is reached by exactly one path, so no memo is needed
+    to weed out duplicate schedules.
+
+    Schedules are yielded as soon as they are found, so the caller can stop after
+    the first few without paying for the rest of the search.
+
+    Args:
+        pool: A CoursePool containing the possible courses
+        group: The index in pool.groups of the course whose sections are to be
+            possibly chosen
+        chosenCourses: A list of courses that have been selected to build a schedule
+        candidates: A bitset of the course indices that are compatible with every
+            course in chosenCourses. It is narrowed down as courses are chosen
+        numCourses: The number of courses necessary to be added to chosenCourses
+        progress: An optional SearchProgress to report to and take cancellation from
+
+    Yields:
+        Lists of Course objects, one per valid weekly schedule
+    """
+    if progress is not None:
+        if progress.cancelled:
+            return
+        progress.nodes += 1
+
+    if len(chosenCourses) == numCourses:
+        if progress is not None:
+            progress.found += 1
+        yield list(chosenCourses)
+        return
+
+    # If there are not enough course names left to build a complete schedule, 
+    # there is no point in going any deeper. Too many chosen already (which is
+    # how a negative numCourses looks) can never be fixed by going deeper either
+    remaining = len(pool.groups) - group
+    if remaining < numCourses - len(chosenCourses) or len(chosenCourses) > numCourses:
+        return
+
+    for index in pool.groups[group]:
+        # The section is valid if it is compatible with every chosen course,
+        # which the candidates bitset already tracks for us
+        if candidates >> index & 1:
+            chosenCourses.append(pool.courses[index])
+            for week in iterMatches(pool, group + 1, chosenCourses,
+                                    candidates & pool.compatible[index], numCourses,
+                                    progress):
+                yield week
+            chosenCourses.pop()
+
+    # Only leave this course out entirely if the rest can still fill the schedule
+    if remaining > numCourses - len(chosenCourses):
+        for week in iterMatches(pool, group + 1, chosenCourses, candidates, numCourses,
+                                progress):
+            yield week
+
+
+def findMatches(pool, group, chosenCourses, candidates, numCourses, weeks):
+    """
+    Runs iterMatches to completion, collecting every schedule into weeks
+
+    Args:
+        pool, group, chosenCourses, candidates, numCourses: See iterMatches
+        weeks: The list that will contain all of the valid weekly schedules
+    """
+    weeks.extend(iterMatches(pool, group, chosenCourses, candidates, numCourses))
+
+
+def iterSchedules(courses, numCourses, progress=None):
+    """
+    The lazy entry point into the engine. Yields valid weekly schedules made up of
+    numCourses non-conflicting courses one at a time, as the search finds them
+
+    Args:
+        courses: A list of Course objects, usually built by importClasses, or a
+            CoursePool if the same courses are going to be generated repeatedly
+        numCourses: The number of courses each schedule must contain
+        progress: An optional SearchProgress to report to and take cancellation from.
+            If it is a RunStats, the 'conflicts' and 'search' phases are timed too
+
+    Yields:
+        Lists of Course objects, one per valid weekly schedule
+    """
+    stats = progress if isinstance(progress, RunStats) else None
+    pool = courses if isinstance(courses, CoursePool) else CoursePool(courses, stats)
+    search = iterMatches(pool, 0, [], (1 << len(pool.courses)) - 1, numCourses, progress)
+    return search if stats is None else stats.timed('search', search)
+
+
+def noMatches():
+    """
+    An empty generator, for when a search is known to find nothing. Callers can
+    still close() it like any other search
+    """
+    return
+    yield
+
+
+def iterSchedulesWith(pool, numCourses, course, progress=None):
+    """
+    Yields only the schedules that include a particular course. This is what 
+    makes adding a single section cheap: every schedule that doesn't include the
+    new section was already found before it was added
+
+    Args:
+        pool: A CoursePool containing course
+        numCourses: The number of courses each schedule must contain
+        course: The Course object every schedule must include
+        progress: An optional SearchProgress to report to and take cancellation from
+
+    Yields:
+        Lists of Course objects, one per valid weekly schedule, with course first
+
+    Raises:
+        ValueError: if the course is not in the pool
+    """
+    index = pool.courses.index(course)
+
+    # A schedule of no courses can't include this one
+    if numCourses < 1:
+        return noMatches()
+
+    # Search a copy of the pool with the course's name pulled out to the front as
+    # a group of one, already chosen
+    focused = copy.copy(pool)
+    focused.groups = [[index]] + [group for group in pool.groups 
+                                  if pool.courses[group[0]].name != course.name]
+    search = iterMatches(focused, 1, [course], pool.compatible[index], numCourses, progress)
+    return progress.timed('search', search) if isinstance(progress, RunStats) else search
+
+
+def constrainedMatches(pool, chosen, domains, numCourses, progress=None):
+    """
+    The constraint propagation search. Each course name is a variable whose domain
+    is a bitset of its sections that are still compatible with everything chosen.
+    The variable with the smallest domain is always filled in next, and after each
+    choice every other domain is narrowed straight away (forward checking). A
+    domain that empties out means that course can't be in the schedule, so once
+    too many of them have emptied the branch is abandoned without going deeper
+
+    Args:
+        pool: A CoursePool containing the possible courses
+        chosen: A list of (group, index) tuples for the sections picked so far
+        domains: A list of (group, domain) tuples for the courses yet to be 
+            decided, none of them empty
+        numCourses: The number of courses each schedule must contain
+        progress: An optional SearchProgress to report to and take cancellation from
+
+    Yields:
+        Lists of Course objects, one per valid weekly schedule
+    """
+    if progress is not None:
+        if progress.cancelled:
+            return
+        progress.nodes += 1
+
+    needed = numCourses - len(chosen)
+    if needed == 0:
+        if progress is not None:
+            progress.found += 1
+        yield [pool.courses[index] for group, index in sorted(chosen)]
+        return
+
+    # Most constrained variable first
+    position = min(range(len(domains)), key=lambda i: bin(domains[i][1]).count('1'))
+    group, domain = domains[position]
+    rest = domains[:position] + domains[position + 1:]
+
+    for index in pool.groups[group]:
+        if domain >> index & 1:
+            compatible = pool.compatible[index]
+            narrowed = [(other, bits & compatible) for other, bits in rest if bits & compatible]
+            if len(narrowed) >= needed - 1:
+                chosen.append((group, index))
+                for week in constrainedMatches(pool, chosen, narrowed, numCourses, progress):
+                    yield week
+                chosen.pop()
+
+    # Only leave this course out entirely if the rest can still fill the schedule
+    if len(rest) >= needed:
+        for week in constrainedMatches(pool, chosen, rest, numCourses, progress):
+            yield week
+
+
+def iterConstrained(courses, numCourses, progress=None):
+    """
+    Yields the same schedules as iterSchedules, using the constraint propagation
+    search instead of plain backtracking. On dense catalogs, where most sections
+    clash with each other, dead ends are found far closer to the top of the tree.
+    Schedules come out in a different order than iterSchedules
+
+    Args:
+        courses, numCourses, progress: See iterSchedules
+
+    Yields:
+        Lists of Course objects, one per valid weekly schedule
+    """
+    stats = progress if isinstance(progress, RunStats) else None
+    pool = courses if isinstance(courses, CoursePool) else CoursePool(courses, stats)
+    domains = [(group, sum(1 << index for index in indices)) 
+               for group, indices in enumerate(pool.groups)]
+    if len(domains) < numCourses or numCourses < 0:
+        search = noMatches()
+    else:
+        search = constrainedMatches(pool, [], domains, numCourses, progress)
+    return search if stats is None else stats.timed('search', search)
+
+
+# The searches generate() can run, by name
+solverModes = {
+    'backtrack': iterSchedules,
+    'csp': iterConstrained,
+}
+
+
+def generate(courses, numCourses, stats=None, mode='backtrack'):
+    """
+    The stable entry point into the engine. Finds every valid weekly schedule
+    made up of numCourses non-conflicting courses
+
+    Args:
+        courses: A list of Course objects, usually built by importClasses, or a
+            CoursePool if the same courses are going to be generated repeatedly
+        numCourses: The number of courses each schedule must contain
+        stats: An optional RunStats to record the run in
+        mode: 'backtrack' for the plain backtracking search, or 'csp' for the 
+            constraint propagation one (see iterConstrained)
+
+    Returns:
+        A list of schedules, each one a list of Course objects
+
+    Raises:
+        ValueError: if mode isn't one of solverModes
+    """
+    if mode not in solverModes:
+        raise ValueError('Unknown solver mode: %s' % mode)
+    return list(solverModes[mode](courses, numCourses, stats))
@@ -0,0 +1,63 @@
+"""
+Instrumentation for diagnosing slow generations. runInstrumented runs every
+phase of the engine on a list of class strings and hands back a RunStats along
+with the schedules, and profileRun wraps any call in cProfile.
+"""
+
+from __future__ import print_function
+
+import cProfile
+import pstats
+import sys
+
+from schedengine.parser import importClasses
+from schedengine.solver import RunStats, iterSchedules
+from schedengine.table import formatTable
+
+
+def runInstrumented(classes, numCourses, formatResults=True, stats=None):
+    """
+    Parses, searches and (optionally) formats, timing every phase
+
+    Args:
+        classes: A list of formatted class strings, see importClasses
+        numCourses: The number of courses each schedule must contain
+        formatResults: Whether to run formatTable over every schedule
+        stats: A RunStats to add to, or None for a fresh one
+
+    Returns:
+        A (schedules, stats) tuple
+    """
+    stats = stats or RunStats()
+    with stats.timer('parse'):
+        courses = importClasses(classes)
+
+    weeks = list(iterSchedules(courses, numCourses, stats))
+
+    if formatResults:
+        with stats.timer('format'):
+            for week in weeks:
+                formatTable(week)
+    return weeks, stats
+
+
+def profileRun(outputPath, func, *args, **kwargs):
+    """
+    Calls func under cProfile
+
+    Args:
+        outputPath: Where to dump the profile, for pstats or a viewer like 
+            snakeviz. If None, the 25 most expensive calls are printed to stderr
+        func: The function to call, followed by its arguments
+
+    Returns:
+        Whatever func returns
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        if outputPath:
+            profiler.dump_stats(outputPath)
+        else:
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(25)
@@ -0,0 +1,121 @@
+"""
+Formats a chosen schedule into a 2D list that the GUI can drop straight into a
+table widget.
+
+Tens of thousands of schedules can be generated, and they all share the same
+few sections, so everything that can be worked out ahead of time is cached: the
+text for each meeting's cell, and the layout of rows for each distinct set of 
+start times. Formatting a schedule is then mostly dict lookups.
+"""
+
+dayHeaders = ['Mon', 'Tues', 'Wed', 'Thur', 'Fri', 'Sat', 'Sun']
+
+# Weekend columns are only added to a table when something meets on the weekend
+weekdayCount = 5
+
+# Each course's cells as (column, start, text) tuples, and row layouts keyed by
+# the start times of a schedule. Both are cleared if they ever grow past 
+# maxCacheSize, which only happens with huge catalogs
+cellCache = {}
+layoutCache = {}
+maxCacheSize = 100000
+
+
+def clockLabel(time):
+    """
+    Converts an easily comparable integer military time to a normal 12HR time
+    """
+    return '%2d:%02d' % ((time // 100) % 12 or 12, time % 100)
+
+
+def courseCells(course):
+    """
+    The cells a course fills in, one per meeting, as (column, start, text) tuples
+    where text is ex: 'COP3502\n 9:30 -10:20'
+    """
+    cells = cellCache.get(course)
+    if cells is None:
+        if len(cellCache) >= maxCacheSize:
+            cellCache.clear()
+        cells = cellCache[course] = tuple((day - 1, start, '%s\n%s -%s' % (course.name, 
+                clockLabel(start), clockLabel(end))) for day, start, end in course.meetings())
+    return cells
+
+
+def rowLayout(stacks):
+    """
+    Works out which row each start time begins at
+
+    Args:
+        stacks: A sorted tuple of (start, rows) pairs, where rows is how many 
+            meetings starting at that time fall on the same day. That is always
+            1 for a valid schedule, but a table of arbitrary courses can have more
+
+    Returns:
+        A dict of start time to the index of its first row (after the header row),
+        and the total number of rows
+    """
+    layout = layoutCache.get(stacks)
+    if layout is None:
+        if len(layoutCache) >= maxCacheSize:
+            layoutCache.clear()
+
+        firstRow = {}
+        row = 1
+        for start, rows in stacks:
+            firstRow[start] = row
+            row += rows
+        layout = layoutCache[stacks] = (firstRow, row - 1)
+    return layout
+
+
+def buildTable(cells, stacks):
+    """
+    Lays cells out in rows by start time, stacking any that share a start and day
+    """
+    firstRow, numRows = rowLayout(stacks)
+    numDays = max([weekdayCount] + [column + 1 for column, start, text in cells])
+
+    tableList = [dayHeaders[:numDays]]
+    for i in range(numRows):
+        tableList.append([[] for day in range(numDays)])
+
+    for column, start, text in cells:
+        row = firstRow[start]
+        while tableList[row][column]:
+            row += 1
+        tableList[row][column] = text
+    return tableList
+
+
+def formatTable(courses):
+    """
+    Turn a list of Course objects into a beautiful 2D list that can be easily
+    translated into a table for display
+
+    Args:
+        courses: A list of chosen Course objects from the backtracking algorithm
+
+    Returns:
+        A 2D list containing the formatted table information. The first row is the
+        day names, and the rest go down through the start times of the meetings, 
+        earliest first. Meetings on different days that start at the same time
+        share a row. Empty cells are empty lists
+    """
+    cells = [cell for course in courses for cell in courseCells(course)]
+
+    # In a valid schedule, no two meetings start at the same time on the same day,
+    # so each start time needs just one row
+    starts = set(start for column, start, text in cells)
+    if len(set((column, start) for column, start, text in cells)) == len(cells) or not cells:
+        return buildTable(cells, tuple((start, 1) for start in sorted(starts)))
+
+    # Otherwise, a start time gets as many rows as the most meetings starting at
+    # it on any one day, so they stack instead of overwriting each other
+    counts = {}
+    for column, start, text in cells:
+        counts[column, start] = counts.get((column, start), 0) + 1
+    stacks = dict((start, 1) for start in starts)
+    for (column, start), count in counts.items():
+        stacks[start] = max(stacks[start], count)
+    return buildTable(cells, tuple(sorted(stacks.items())))
@@ -216,10 +216,8 @@ class Ui_Schedule(object):
         self.generatedWeeksCombo = QtGui.QComboBox(self.verticalLayoutWidget_2)
         self.generatedWeeksCombo.setObjectName("generatedWeeksCombo")
         self.verticalLayout.addWidget(self.generatedWeeksCombo)
-        self.generatedTable = QtGui.QTableWidget(self.verticalLayoutWidget_2)
+        self.generatedTable = QtGui.QTableView(self.verticalLayoutWidget_2)
         self.generatedTable.setObjectName("generatedTable")
-        self.generatedTable.setColumnCount(0)
-        self.generatedTable.setRowCount(0)
         self.verticalLayout.addWidget(self.generatedTable)
         self.schedulesTab.addTab(self.tab_3, "")
 
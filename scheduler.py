@@ -8,64 +8,157 @@ the fact that the GUI is now being used, but simply injecting the old code
 base was an easy beginning step :)
 """
 
+import os
 import sys
+import time
 import qdarkstyle
-from PySide.QtCore import Qt
-from PySide.QtGui import QMainWindow, QApplication, QLabel, QStyleFactory, QTableWidgetItem
+from PySide.QtCore import Qt, QThread, QTimer, QTime, Signal, QAbstractTableModel, QModelIndex
+from PySide.QtGui import QMainWindow, QApplication, QLabel, QStyleFactory, QPushButton, \
+        QHBoxLayout, QVBoxLayout, QFileDialog, QMessageBox, QPlainTextEdit, QWidget, \
+        QCheckBox, QComboBox, QTimeEdit
 from schedui import Ui_Schedule 
+from schedengine import Course, formatTable, formatCourse, iterCatalog, RunStats, \
+        ScheduleCache, IncrementalSolver, topSchedules, countSchedules
+from schedengine.count import largeResult, describeCount
+from schedengine.index import ScheduleIndex
+from schedengine.parser import weekdayDict
+from schedengine.table import dayHeaders, weekdayCount
+
+def rankedWeeks(courses, numCourses, k, progress):
+    """
+    Runs topSchedules lazily, so that it runs on whichever thread iterates it
+    """
+    for cost, week in topSchedules(courses, numCourses, k, progress=progress):
+        yield week
+
+def cachedWeeks(weeks, progress):
+    """
+    Replays cached schedules as though they were being found, so they reach the
+    GUI in batches just like a search's
+    """
+    for week in weeks:
+        if progress.cancelled:
+            return
+        progress.found += 1
+        yield week
 
-class Course(object):
+class WeekTableModel(QAbstractTableModel):
     """
-    This class holds day and time information for a course such that it can be 
-    easily compared to other courses to see if two courses conflict in times
+    Serves a single generated week to the 'Generated' tab's table view. Switching
+    to another week with the same shape (rows of start times, and weekend columns
+    or not) only swaps out the data and emits dataChanged, so the view doesn't 
+    have to rebuild or resize anything
     """
-    
-    def __init__(self, times, name):
+
+    def __init__(self, parent=None):
+        super(WeekTableModel, self).__init__(parent)
+        self.table = []
+        self.headers = dayHeaders[:weekdayCount]
+
+        # A RunStats to time formatting in, if anyone is watching
+        self.stats = None
+
+    def setWeek(self, week):
         """
-        Creates a new course with the given times and name
+        Shows a new week, or nothing at all
 
         Args:
-            times: a dict containing days (key) mapping to times (values)
-            name: a str containing the course name
+            week: A list of Course objects from the solver, or None to clear
         """
-        self.times = times
-        self.name = name
+        # formatTable's first row is the day names, which go in the header instead
+        if not week:
+            table = [dayHeaders[:weekdayCount]]
+        elif self.stats is None:
+            table = formatTable(week)
+        else:
+            with self.stats.timer('format'):
+                table = formatTable(week)
+        headers, table = table[0], table[1:]
+
+        if len(table) != len(self.table) or len(headers) != len(self.headers):
+            self.beginResetModel()
+            self.table = table
+            self.headers = headers
+            self.endResetModel()
+        else:
+            self.table = table
+            if table:
+                self.dataChanged.emit(self.index(0, 0), 
+                        self.index(len(table) - 1, len(headers) - 1))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.table)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        # Empty cells are stored as empty lists by formatTable
+        return self.table[index.row()][index.column()] or None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+class GenerateThread(QThread):
+    """
+    Runs a schedengine search off of the GUI thread so the window doesn't freeze
+    on large inputs. Schedules are handed back to the GUI in batches through the
+    weeksFound signal as they are found, and the search can be stopped early 
+    through the shared SearchProgress object
+    """
 
-        # Maybe make this a class variable?
-        self.numToDay = {1:'M', 2:'T', 3:'W', 4:'R', 5:'F'}
+    weeksFound = Signal(object)
 
-    def printCourse(self):
-        """
-        Nothing to see here, just a nice debugging tool :)
-        """
-        print self.name
-        for day, time in self.times.items():
-            print self.numToDay[day], time
-        print
+    # A batch is sent once it is this big, or once this many seconds have passed
+    # since the last one, whichever comes first
+    batchSize = 200
+    batchInterval = 0.1
 
-    def valid(self, otherCourse):
+    def __init__(self, setup, progress, fromCache=False, parent=None):
         """
-        Compares date/times for two courses to see if they conflict
-
         Args:
-            otherCourse: another course object to compare to
-        
-        Returns:
-            boolean of whether the classes can be placed together or not
-        """
-        if self.name == otherCourse.name:
-            return False
-
-        for day in self.times:
-            start = self.times[day][0]
-            end = self.times[day][1]
-            for otherDay in otherCourse.times:
-                oStart = otherCourse.times[otherDay][0]
-                oEnd = otherCourse.times[otherDay][1]
-                if day == otherDay:
-                    if not (start > oEnd or oStart > end):
-                        return False
-        return True
+            setup: Called on the worker thread before the search starts, so slow
+                preparation doesn't freeze the window. Returns a (search, solver,
+                note) tuple: an iterable of schedules built with progress passed 
+                into it, the IncrementalSolver it fills in (or None), and a note 
+                to show alongside the progress
+            progress: The SearchProgress the search reports to
+            fromCache: Whether the schedules are being loaded from the cache, in
+                which case there's no need to store them again
+            parent: The QObject that owns the thread
+        """
+        super(GenerateThread, self).__init__(parent)
+        self.setup = setup
+        self.progress = progress
+        self.fromCache = fromCache
+        self.solver = None
+        self.note = ''
+
+        # Only set once the search has run to the end. A cancelled search, or one
+        # that raised, leaves it False
+        self.completed = False
+
+    def run(self):
+        search, self.solver, self.note = self.setup()
+        batch = []
+        lastSent = time.time()
+        for week in search:
+            batch.append(week)
+            if len(batch) >= self.batchSize or time.time() - lastSent > self.batchInterval:
+                self.weeksFound.emit(batch)
+                batch = []
+                lastSent = time.time()
+
+        if batch:
+            self.weeksFound.emit(batch)
+        self.completed = not self.progress.cancelled
+
+    def cancel(self):
+        self.progress.cancel()
 
 class Scheduler(QMainWindow, Ui_Schedule):
     """
@@ -93,19 +186,95 @@ class Scheduler(QMainWindow, Ui_Schedule):
 
         self.dayButtons = [self.mDay, self.tDay, self.wDay, self.rDay, self.fDay]
         self.classInList = set()
-        self.classInSched = set()
-        self.tables = []
+        self.classInSched = {}
+        self.worker = None
+
+        # Every generated schedule, and the numbers of those that pass the filters
+        # (and so are in the combobox)
+        self.weeks = ScheduleIndex()
+        self.shownWeeks = []
+
+        # How many schedules to show when there are too many to list them all
+        self.topCount = 200
+
+        # The result of the last finished generation. Adding or removing a few
+        # sections before generating again only searches for what changed
+        self.solver = None
+
+        # Generated schedules are kept around between runs and app restarts, so 
+        # regenerating the same scenario is just a lookup
+        self.scheduleCache = ScheduleCache(directory=os.path.join(
+                os.path.expanduser('~'), '.scheduler', 'cache'))
+
+        # The progress label and cancel button aren't part of the QtDesigner file,
+        # so they are slotted in above the combobox in the 'Generated' tab here
+        self.progressLabel = QLabel(self.verticalLayoutWidget_2)
+        self.cancelBtn = QPushButton('Cancel', self.verticalLayoutWidget_2)
+        self.cancelBtn.setEnabled(False)
+        self.cancelBtn.clicked.connect(self.cancelGenerate)
+        progressLayout = QHBoxLayout()
+        progressLayout.addWidget(self.progressLabel)
+        progressLayout.addWidget(self.cancelBtn)
+        self.verticalLayout.insertLayout(0, progressLayout)
+
+        # Filters for the generated schedules go in a row under the progress label
+        self.freeDayBoxes = []
+        filterLayout = QHBoxLayout()
+        filterLayout.addWidget(QLabel('Free:', self.verticalLayoutWidget_2))
+        for day in 'MTWRF':
+            box = QCheckBox(day, self.verticalLayoutWidget_2)
+            box.toggled.connect(self.applyFilter)
+            filterLayout.addWidget(box)
+            self.freeDayBoxes.append(box)
+        self.earliestCheck = QCheckBox('Nothing before', self.verticalLayoutWidget_2)
+        self.earliestCheck.toggled.connect(self.applyFilter)
+        self.earliestTime = QTimeEdit(QTime(10, 0), self.verticalLayoutWidget_2)
+        self.earliestTime.timeChanged.connect(self.applyFilter)
+        self.includeCombo = QComboBox(self.verticalLayoutWidget_2)
+        self.includeCombo.addItem('Any section')
+        self.includeCombo.currentIndexChanged.connect(self.applyFilter)
+        filterLayout.addWidget(self.earliestCheck)
+        filterLayout.addWidget(self.earliestTime)
+        filterLayout.addWidget(self.includeCombo, 1)
+        self.verticalLayout.insertLayout(1, filterLayout)
+
+        # The import button isn't in the QtDesigner file either. It takes the empty
+        # spot to the left of the other schedule buttons
+        self.importBtn = QPushButton('Import Catalog', self.gridLayoutWidget)
+        self.importBtn.clicked.connect(self.importCatalog)
+        self.gridLayout.addWidget(self.importBtn, 2, 0, 1, 1)
+
+        # Rows are only resized when the number of courses per week changes, not
+        # every time a different week is picked
+        self.weekModel = WeekTableModel(self)
+        self.generatedTable.setModel(self.weekModel)
+        self.weekModel.modelReset.connect(self.generatedTable.resizeRowsToContents)
+
+        # Polls the running search for its node and schedule counts
+        self.progressTimer = QTimer(self)
+        self.progressTimer.setInterval(100)
+        self.progressTimer.timeout.connect(self.updateProgress)
+
+        # Timings and counters for the last generation, shown in the 'Debug' tab
+        self.stats = RunStats()
+        self.weekModel.stats = self.stats
+        debugTab = QWidget()
+        self.debugText = QPlainTextEdit(debugTab)
+        self.debugText.setReadOnly(True)
+        debugLayout = QVBoxLayout(debugTab)
+        debugLayout.addWidget(self.debugText)
+        self.schedulesTab.addTab(debugTab, 'Debug')
 
         self.show()
 
     def removeFromSched(self):
         """
         Removes the current item selected in the Schedule
-        list widget. Also removes it from the classInSched set
+        list widget. Also removes it from the classInSched dict
         """
         name = self.scheduleList.currentItem().text()
         self.scheduleList.takeItem(self.scheduleList.currentRow())
-        self.classInSched.remove(name)
+        del self.classInSched[name]
 
     def removeFromList(self):
         """
@@ -137,213 +306,293 @@ class Scheduler(QMainWindow, Ui_Schedule):
 
     def newCourse(self):
         """
-        Takes the inputted course information and adds the new course to the 
-        schedule list widget, formatted in the format matching the previous
-        scheduler's so that the parsing does not need to be rewritten... yet...
+        Takes the inputted course information and builds a Course object from it
+        directly, so nothing needs to be parsed back out of the list widget when 
+        generating. The course is shown in the schedule list widget in the same
+        format the text parser reads, and classInSched maps that text to the Course
         """
+        if self.classSelector.currentText() == '':
+            return
 
-        # This is used sort of like a java StringBuilder so that new Strings are
-        # not constantly being allocated for, but being a dynamic array, the memory
-        # being wasted may undo the good it is doing
-        courseText = []
+        name = self.classSelector.currentText()
+        courseText = [name]
+        times = {}
 
-        if self.classSelector.currentText() == '':
+        startTime = self.startTime.time()
+        endTime = self.endTime.time()
+        start = startTime.hour() * 100 + startTime.minute()
+        end = endTime.hour() * 100 + endTime.minute()
+        if end < start:
             return
 
-        courseText.append(self.classSelector.currentText())
-        
-        # This bool ensures that a course is not added unless it has days specified
-        noneChecked = True
         for button in self.dayButtons:
             if button.isChecked():
-                noneChecked = False
-
                 # Abuse the fact that the buttons are named with the first letter
                 # being the day they represent :)
                 day = button.objectName()[0].upper()
-                startTime = self.startTime.time()
-                endTime = self.endTime.time()
-                formatTimes = str(startTime.hour()) + ':' + str(startTime.minute()) + \
-                        '-' + str(endTime.hour()) + ':' + str(endTime.minute())
-                courseText.append(day + formatTimes)
+                times[weekdayDict[day]] = (start, end)
+                courseText.append('%s%d:%02d-%d:%02d' %(day, start // 100, start % 100, 
+                        end // 100, end % 100))
 
                 button.setCheckState(Qt.Unchecked)
 
-        if noneChecked:
+        # A course is not added unless it has days specified
+        if not times:
             return 
 
         formattedClass = ' '.join(courseText)
         self.scheduleList.addItem(formattedClass)
-        self.classInSched.add(formattedClass)
+        self.classInSched[formattedClass] = Course(times, name)
 
-    def importClasses(self, classes):
+    def importCatalog(self):
         """
-        Takes a list of formatted class strings and turns them into 'Course' objects. Because
-        the way the GUI is now done, this function could be avoided by having the Course objects
-        be created whenever 'newCourse' is called, however for now, it was easier to migrate the
-        old Terminal scheduler code to work like this, being injected into the GUI code. 
+        Bulk loads a catalog file (text, CSV or JSON Lines, see schedengine.catalog)
+        into the schedule. The file is streamed straight into Course objects, and
+        the list widgets are only touched once at the end, all in one go
+        """
+        path = QFileDialog.getOpenFileName(self, 'Import Catalog', '', 
+                'Catalogs (*.txt *.csv *.jsonl *.ndjson);;All Files (*)')[0]
+        if not path:
+            return
 
-        Args:
-            classes[]: list of strings. Course code, then days and times space separated
-            ex: COP3502 M9:30-10:20 W9:30-10:20
-            The format comes from the schedule list widget, done by the newCourse method 
+        newClasses = []
+        newNames = []
+        try:
+            for course in iterCatalog(path):
+                formattedClass = formatCourse(course)
+                if formattedClass in self.classInSched:
+                    continue
+                self.classInSched[formattedClass] = course
+                newClasses.append(formattedClass)
+
+                if course.name not in self.classInList:
+                    self.classInList.add(course.name)
+                    newNames.append(course.name)
+        except (IOError, ValueError) as e:
+            # Whatever was read before the bad line is still added below
+            QMessageBox.warning(self, 'Import Catalog', str(e))
+
+        self.scheduleList.addItems(newClasses)
+        self.classList.addItems(newNames)
+        self.classSelector.addItems(newNames)
 
-        Returns:
-            A list of Course objects that have the class information from classes
+    def generate(self):
+        """
+        Where the magic happens. The Course objects built by newCourse are handed to
+        the schedengine backtracking algorithm, which runs on a worker thread, and
+        the schedules it finds are streamed into the 'Generated' tab as they arrive.
+        
+        If the same courses have been generated before, the cached schedules are
+        shown instead. If only a few sections have been added or removed since the
+        last generation, the old schedules are kept (minus any using a removed 
+        section) and only the schedules using the new sections are searched for
         """
-        courses = []
-        weekdayDict = {'M':1, 'T':2, 'W':3, 'R':4, 'F':5}
+        self.cancelGenerate()
+        if self.worker is not None:
+            self.worker.wait()
+            self.worker = None
+
+        # The solver is only kept once a run has completed. Taking it here means a
+        # run that is cancelled, replaced or crashes can never leave a half-filled
+        # solver behind to be reused or cached
+        solver, self.solver = self.solver, None
+
+        courses = list(self.classInSched.values())
+        numCourses = len(self.classInList)
+        self.weeks = ScheduleIndex()
+        self.shownWeeks = []
+
+        # The section filter offers whatever sections are being generated from
+        self.includeCombo.blockSignals(True)
+        self.includeCombo.clear()
+        self.includeCombo.addItem('Any section')
+        for name in sorted(self.classInSched):
+            # The Course itself rides along, since its section may be removed
+            # from classInSched while these schedules are still being filtered
+            self.includeCombo.addItem(name, self.classInSched[name])
+        self.includeCombo.blockSignals(False)
+        
+        self.stats = self.weekModel.stats = RunStats()
+        self.generatedWeeksCombo.clear()
+        self.weekModel.setWeek(None)
+
+        progress = self.stats
+        cached = self.scheduleCache.get(courses, numCourses)
+        if cached is not None:
+            # Building the solver means building its CoursePool, which is slow for
+            # big catalogs, so it's done on the worker thread like everything else
+            setup = lambda: (cachedWeeks(cached, progress), 
+                             IncrementalSolver(courses, numCourses, cached), 
+                             'Loaded from cache. ')
+        elif solver is not None and solver.numCourses == numCourses:
+            # Removals are just a filter, so they are done here and the surviving
+            # schedules are shown right away. The worker only searches for the adds
+            current = set(courses)
+            for course in list(solver.courses):
+                if course not in current:
+                    solver.remove(course)
+            self.showWeeks(solver.weeks)
+            setup = lambda: (solver.update(courses, progress), solver, '')
+        else:
+            setup = lambda: self.chooseSearch(courses, numCourses, progress)
+
+        self.worker = GenerateThread(setup, progress, cached is not None, self)
+        self.worker.weeksFound.connect(self.addWeeks)
+        self.worker.finished.connect(self.generateFinished)
+        self.cancelBtn.setEnabled(True)
+        self.progressTimer.start()
+        self.worker.start()
+
+    def chooseSearch(self, courses, numCourses, progress):
+        """
+        Builds a fresh solver, counts the schedules it would find, and picks how to
+        search for them. Both steps can take a while on big catalogs, so this runs
+        on the worker thread
 
-        for course in classes:
-            splitStr = course.split()
-            name = splitStr[0]
-            times = {}
+        Returns:
+            A (search, solver, note) tuple, see GenerateThread
+        """
+        with progress.timer('conflicts'):
+            solver = IncrementalSolver(courses, numCourses)
+
+        # Enumerating millions of schedules would take forever and nobody would
+        # page through them, so only the best few are found instead. An estimate
+        # can be wildly low, so only an exact count is small enough to list
+        with progress.timer('count'):
+            count, exact = countSchedules(solver.pool, numCourses)
+        if exact and count <= largeResult:
+            return solver.solve(progress), solver, ''
+
+        # A ranked run only has the best few schedules, so there is no solver to keep
+        note = '%s, ranking the best %d. ' % (describeCount(count, exact), self.topCount)
+        return rankedWeeks(solver.pool, numCourses, self.topCount, progress), None, note
+
+    def cancelGenerate(self):
+        """
+        Stops the running search, if there is one. Schedules found so far are kept
+        """
+        if self.worker is not None:
+            self.worker.cancel()
 
-            # The (-1) accounts for the first spot being the class name in the list
-            for i in xrange(len(splitStr)-1):
-                courseTime = splitStr[1 + i]
-                weekday = weekdayDict[courseTime[0]]
+    def closeEvent(self, event):
+        """
+        Stops the search before the window goes away. Qt aborts the whole program
+        if a QThread is destroyed while it's still running
+        """
+        self.cancelGenerate()
+        if self.worker is not None:
+            self.worker.wait()
+        super(Scheduler, self).closeEvent(event)
 
-                # Parse the time by looking for ':' to denote splitting hours and minutes
-                # as well as the '-' to split start and end times. Could using .split() have
-                # been more helpful? Hmm...
-                startTime = int(courseTime[1:courseTime.find(':')]) * 100 \
-                + int(courseTime[courseTime.find(':') + 1:courseTime.find('-')])
+    def generateFinished(self):
+        """
+        Called once the worker thread is done, whether it finished or was cancelled.
+        Only complete results are cached or kept around for the next generation
+        """
+        if self.sender() is not self.worker:
+            return
 
-                endTime = int(courseTime[courseTime.find('-')+1:courseTime.find(':', 5)]) * 100 + \
-                int(courseTime[courseTime.find(':', 5) + 1:])
+        self.progressTimer.stop()
+        self.updateProgress()
+        self.cancelBtn.setEnabled(False)
 
-                times[weekday] = (startTime, endTime)
+        if not self.worker.completed or self.worker.solver is None:
+            return
 
-            newCourse = Course(times, name)
-            courses.append(newCourse)
-        
-        return courses
+        self.solver = self.worker.solver
+        if self.worker.fromCache:
+            return
+        try:
+            self.scheduleCache.put(self.solver.courses, self.solver.numCourses, self.solver.weeks)
+        except (IOError, OSError):
+            # The disk cache is only an optimisation, the results are all here
+            pass
 
-    def generate(self):
+    def updateProgress(self):
         """
-        Where the magic happens. importClasses turns the list widget containing the 
-        classes and times into Course objects. A backtracking algorithm finds every 
-        possible scheduling arrangement, and then sends the data to a table in the
-        'Generated' tab
+        Shows how far along the running search is
         """
-        courses = self.importClasses(list(self.classInSched))
-        weeks = []
+        if self.worker is None:
+            return
 
-        self.findMatches(courses, 0, [], len(self.classInList), [], weeks)
-        
-        self.generatedWeeksCombo.clear()
-        self.generatedTable.clear()
-        self.generatedWeeksCombo.addItems([str(n) for n in range(1, len(weeks)+1)])
-        
-        self.tables = weeks
-        self.displayTable()
+        progress = self.worker.progress
+        status = 'Cancelled. ' if progress.cancelled else ''
+        self.progressLabel.setText('%s%s%d schedules found, %d nodes explored' 
+                %(status, self.worker.note, progress.found, progress.nodes))
+        self.updateDebug()
 
-    def displayTable(self):
+    def updateDebug(self):
         """
-        Depending on what schedule is being viewed (as denoted by the combobox),
-        the table widget is populated with data from the tables list
+        Refreshes the 'Debug' tab with the current run's timings and counters
         """
-        if not self.tables:
-            return
-        
-        # This second clear is used so that a table is cleared upon changing the
-        # combobox index, as well as if a new schedule is generated
-        self.generatedTable.clear()
+        self.debugText.setPlainText('\n'.join(self.stats.summary()))
 
-        # The table index where the data will be fetched from the tables list
-        table = self.tables[self.generatedWeeksCombo.currentIndex()]
-
-        self.generatedTable.setRowCount(len(table))
-        self.generatedTable.setColumnCount(len(table[0]))
-
-        for i in xrange(len(table)):
-            for j in xrange(len(table[i])):
-                if table[i][j]:
-                    self.generatedTable.setItem(i, j, QTableWidgetItem(str(table[i][j])))
-                    self.generatedTable.resizeRowToContents(i)
-
-    def findMatches(self, courses, index, chosenCourses, numCourses, memo, weeks):
+    def addWeeks(self, batch):
         """
-        A backtracking algorithm that builds every valid schedule possible, given the
-        courses from the courses list.
+        Adds a batch of schedules from the worker thread to the combobox. Adding the
+        first batch to the empty combobox fires currentIndexChanged, which displays
+        the first schedule
 
         Args:
-            courses: A list of Course objects corresponding to the possible courses
-            index: The current index in courses that is to be possibly chosen
-            chosenCourses: A list of courses that have been selected to build a schedule
-            numCourses: The number of courses necessary to be added to chosenCourses
-            
-            TODO (Rwales): Change memo to a set and make Course objects comparable
-            memo: A list corresponding to the courses already seen. 
-            
-            weeks: The list that will contain all of the valid weekly schedules
-        """
-        if len(chosenCourses) == numCourses and chosenCourses not in memo:
-            memo.append(list(chosenCourses))
-            weeks.append(self.formatTable(chosenCourses))
-
-        # If we have reached the end of our list of courses, but there are not 
-        # enough chosen courses to build a complete schedule, return 
-        if index == len(courses):
+            batch: A list of schedules, each one a list of Course objects
+        """
+        # Batches from a cancelled run can still be queued up behind a new one
+        if self.sender() is not self.worker:
             return
-        
-        # Compare a candidate course to every course chosen so far to check validity
-        valid = True
-        for course in chosenCourses:
-            if not course.valid(courses[index]):
-                valid = False
-        self.findMatches(courses, index + 1, chosenCourses, numCourses, memo, weeks)
-        
-        if valid:
-            chosenCourses.append(courses[index])
-            self.findMatches(courses, index + 1, chosenCourses, numCourses, memo, weeks)
-            chosenCourses.remove(courses[index])        
 
-    def formatTable(self, courses):
+        self.showWeeks(batch)
+
+    def showWeeks(self, batch):
         """
-        Turn a list of Course objects into a beautiful 2D list that can be easily
-        translated into a QtTableWidget for display
+        Appends schedules to the weeks index, and the ones that pass the current
+        filters to the combobox
 
         Args:
-            courses: A list of chosen Course objects from the backtracking algorithm
+            batch: A list of schedules, each one a list of Course objects
+        """
+        start = len(self.weeks)
+        self.weeks.extend(batch)
+        matches = self.weeks.query(start=start, **self.filterArgs())
+        self.shownWeeks.extend(matches)
+        self.generatedWeeksCombo.addItems([str(n + 1) for n in matches])
 
-        Returns:
-            A 2D list containing the formatted table information
+    def filterArgs(self):
         """
-        
-        # Sort the times by the start so that we can greedily choose what times are
-        # placed first in the table. Greedy algorithms, hooray for CS!
-        startTimes = sorted([course.times.values()[0][0] for course in courses])
+        The filter widgets' state, as keyword arguments for ScheduleIndex.query
+        """
+        args = {'freeDays': [day for day, box in enumerate(self.freeDayBoxes, 1) 
+                             if box.isChecked()]}
+        if self.earliestCheck.isChecked():
+            earliest = self.earliestTime.time()
+            args['earliest'] = earliest.hour() * 100 + earliest.minute()
+        if self.includeCombo.currentIndex() > 0:
+            args['includes'] = [self.includeCombo.itemData(self.includeCombo.currentIndex())]
+        return args
+
+    def applyFilter(self):
+        """
+        Refills the combobox with just the schedules that pass the filters. The
+        schedule numbers stay the same, so a schedule can be found again later
+        """
+        self.shownWeeks = self.weeks.query(**self.filterArgs())
+        self.generatedWeeksCombo.clear()
+        self.generatedWeeksCombo.addItems([str(n + 1) for n in self.shownWeeks])
+        if not self.shownWeeks:
+            self.weekModel.setWeek(None)
 
-        timeToIndex = {}
-        tableList = []
+    def displayTable(self):
+        """
+        Depending on what schedule is being viewed (as denoted by the combobox),
+        the table model is handed that week from the weeks index. Only the week
+        being viewed is ever formatted
+        """
+        index = self.generatedWeeksCombo.currentIndex()
+        if index < 0 or index >= len(self.shownWeeks):
+            return
 
-        for i in xrange(len(courses) + 1):
-            tableList.append([[], [], [], [], []])
-        
-        # This is the top header of the table.
-        tableList[0][0] = 'Mon'
-        tableList[0][1] = 'Tues'
-        tableList[0][2] = 'Wed'
-        tableList[0][3] = 'Thur'
-        tableList[0][4] = 'Fri'
-
-        # This is the greedy part. Put the earliest times at the topmost rows
-        for x in xrange(len(courses)):
-            timeToIndex[startTimes[x]] = x
-        
-        for course in courses:
-            days = course.times.keys()
-            
-            for day in days:
-                # Converting the times from easily comparable integer, military times, to normal 12HR times
-                courseString = course.name + '\n' + "%2d:%02d -%2d:%02d" %(course.times[day][0]/100 - \
-                12*(0 if course.times[day][0]/100 <= 12 else 1), course.times[day][0]%100, course.times[day][1]/100 - \
-                12*(0 if course.times[day][1]/100 <= 12 else 1), course.times[day][1]%100)  
-                tableList[timeToIndex[course.times[day][0]] + 1][day-1] = courseString
-        
-        return tableList
+        with self.stats.timer('render'):
+            self.weekModel.setWeek(self.weeks.week(self.shownWeeks[index]))
+        self.updateDebug()
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -0,0 +1,64 @@
+"""
+Runs the command line batch mode end to end, writing to files
+"""
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from schedengine.catalog import iterJsonLines
+from schedengine.cli import main
+from schedengine.parser import formatCourse
+
+from test_solver import BruteForceTest, bruteForce, randomCatalog
+
+
+class OutputFileTest(BruteForceTest):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.courses = randomCatalog(3, numNames=4, sections=3)
+        self.catalog = os.path.join(self.directory, 'courses.txt')
+        with io.open(self.catalog, 'w', encoding='utf-8') as out:
+            for course in self.courses:
+                out.write(u'%s\n' % formatCourse(course))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def runCli(self, fmt, *extra):
+        path = os.path.join(self.directory, 'out.' + fmt)
+        self.assertEqual(main([self.catalog, '-n', '3', '-f', fmt, '-o', path] + list(extra)), 0)
+        with io.open(path, encoding='utf-8', newline='') as result:
+            return result.read()
+
+    def testJsonLines(self):
+        weeks = [list(iterJsonLines([json.dumps(section)
+                                     for section in json.loads(line)['sections']]))
+                 for line in self.runCli('jsonl').splitlines()]
+        self.assertSchedules(weeks, bruteForce(self.courses, 3), 'jsonl')
+
+    def testCsv(self):
+        rows = list(csv.reader(self.runCli('csv').splitlines()))
+        self.assertEqual(rows[0], ['schedule', 'name', 'days', 'start', 'end'])
+
+        # One row per meeting, so rebuild each schedule's sections from its rows
+        schedules = {}
+        for number, name, day, start, end in rows[1:]:
+            schedules.setdefault(number, {}).setdefault(name, []).append(
+                    {'days': day, 'start': start, 'end': end})
+        weeks = [list(iterJsonLines([json.dumps({'name': name, 'meetings': meetings})
+                                     for name, meetings in sections.items()]))
+                 for sections in schedules.values()]
+        self.assertSchedules(weeks, bruteForce(self.courses, 3), 'csv')
+
+    def testLimit(self):
+        self.assertEqual(len(self.runCli('text', '-l', '2').splitlines()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
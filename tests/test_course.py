@@ -0,0 +1,47 @@
+"""
+Checks Course's conflict test against comparing meetings directly
+"""
+
+import itertools
+import unittest
+
+from schedengine.course import Course
+
+from test_solver import randomCatalog
+
+
+def meetingsClash(first, second):
+    """
+    Whether any meeting of one course touches a meeting of the other
+    """
+    return any(day == otherDay and start <= otherEnd and otherStart <= end
+               for day, start, end in first.meetings()
+               for otherDay, otherStart, otherEnd in second.meetings())
+
+
+class CourseTest(unittest.TestCase):
+
+    def testValid(self):
+        for seed in range(20):
+            courses = randomCatalog(seed, numNames=6, sections=4)
+            for first, second in itertools.permutations(courses, 2):
+                expected = first.name != second.name and not meetingsClash(first, second)
+                self.assertEqual(first.valid(second), expected,
+                                 (first.ident, second.ident))
+
+    def testWeekEnds(self):
+        monday = Course({1: [(0, 30), (2200, 2359)]}, 'A')
+        self.assertFalse(monday.valid(Course({1: (2359, 2359)}, 'B')))
+        self.assertTrue(monday.valid(Course({2: (0, 100)}, 'B')))
+        self.assertFalse(Course({7: (2300, 2359)}, 'A').valid(Course({7: (2359, 2359)}, 'B')))
+        self.assertTrue(Course({7: (2300, 2359)}, 'A').valid(Course({1: (2300, 2359)}, 'B')))
+
+    def testTimes(self):
+        times = {1: ((900, 950), (1300, 1450)), 3: ((900, 950),)}
+        course = Course({3: (900, 950), 1: [(1300, 1450), (900, 950)]}, 'A')
+        self.assertEqual(course.times, times)
+        self.assertEqual(Course(course.times, 'A'), course)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Checks the schedule searches against a brute-force reference on small random
+catalogs. Run with python -m unittest discover tests
+"""
+
+import itertools
+import random
+import shutil
+import tempfile
+import unittest
+
+from schedengine import (ScheduleCache, IncrementalSolver, countSchedules, generate,
+                         importClasses, iterConstrained)
+
+
+def randomCatalog(seed, numNames=4, sections=3):
+    """
+    A small catalog of random sections, with no two sections exactly alike
+
+    Returns:
+        A list of Course objects
+    """
+    rand = random.Random(seed)
+    lines = []
+    for name in range(numNames):
+        for section in range(sections):
+            days = rand.sample('MTWRF', rand.randint(1, 3))
+            hour, minute = rand.randint(8, 17), rand.choice([0, 30])
+            end = '%d:%02d' % (hour + 1, minute + rand.choice([0, 15]))
+            lines.append('C%d ' % name + ' '.join('%s%d:%02d-%s' % (day, hour, minute, end)
+                                                  for day in days))
+
+    courses = []
+    for course in importClasses(lines):
+        if course not in courses:
+            courses.append(course)
+    return courses
+
+
+def bruteForce(courses, numCourses):
+    """
+    Every valid schedule, found by trying every combination of sections
+
+    Returns:
+        A set of frozensets of course idents
+    """
+    if numCourses < 0:
+        return set()
+    return set(frozenset(course.ident for course in combo)
+               for combo in itertools.combinations(courses, numCourses)
+               if all(a.valid(b) for a, b in itertools.combinations(combo, 2)))
+
+
+class BruteForceTest(unittest.TestCase):
+
+    def assertSchedules(self, weeks, expected, message):
+        """
+        Checks that weeks holds exactly the expected schedules, each one once
+        """
+        found = [frozenset(course.ident for course in week) for week in weeks]
+        self.assertEqual(len(found), len(set(found)), message)
+        self.assertEqual(set(found), expected, message)
+
+
+class SearchTest(BruteForceTest):
+
+    def cases(self):
+        for seed in range(20):
+            courses = randomCatalog(seed)
+            names = len(set(course.name for course in courses))
+            for numCourses in range(-1, names + 2):
+                yield seed, courses, numCourses
+
+    def testGenerate(self):
+        for seed, courses, numCourses in self.cases():
+            for mode in ('backtrack', 'csp'):
+                self.assertSchedules(generate(courses, numCourses, mode=mode),
+                                     bruteForce(courses, numCourses),
+                                     (seed, numCourses, mode))
+
+    def testIterConstrained(self):
+        for seed, courses, numCourses in self.cases():
+            search = iterConstrained(courses, numCourses)
+            self.assertSchedules(search, bruteForce(courses, numCourses), (seed, numCourses))
+            search.close()
+
+    def testCountSchedules(self):
+        for seed, courses, numCourses in self.cases():
+            count, exact = countSchedules(courses, numCourses)
+            self.assertTrue(exact)
+            self.assertEqual(count, len(bruteForce(courses, numCourses)), (seed, numCourses))
+
+    def testEstimatedCount(self):
+        # Too few states for an exact count, so every one of these is estimated
+        for seed in range(8):
+            courses = randomCatalog(seed, numNames=6, sections=4)
+            for numCourses in range(2, 7):
+                count, exact = countSchedules(courses, numCourses, maxStates=3)
+                actual = len(bruteForce(courses, numCourses))
+                self.assertFalse(exact)
+                self.assertGreater(count, 0, (seed, numCourses))
+                if actual:
+                    self.assertTrue(0.5 <= count / float(actual) <= 2, (seed, numCourses, count, actual))
+
+
+class IncrementalSolverTest(BruteForceTest):
+
+    def testUpdate(self):
+        for seed in range(20):
+            rand = random.Random(seed)
+            catalog = randomCatalog(seed, numNames=5, sections=4)
+            for numCourses in (3, 4, 5):
+                current = rand.sample(catalog, 10)
+                solver = IncrementalSolver(current, numCourses)
+                list(solver.solve())
+                for step in range(6):
+                    current = rand.sample(catalog, rand.randint(3, len(catalog)))
+                    list(solver.update(current))
+                    self.assertSchedules(solver.weeks, bruteForce(current, numCourses),
+                                         (seed, numCourses, step))
+
+
+class ScheduleCacheTest(BruteForceTest):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testRoundTrip(self):
+        for seed in range(10):
+            courses = randomCatalog(seed)
+            shuffled = list(courses)
+            random.Random(seed).shuffle(shuffled)
+            for numCourses in range(0, 5):
+                expected = bruteForce(courses, numCourses)
+                memory = ScheduleCache()
+                memory.put(courses, numCourses, generate(courses, numCourses))
+                ScheduleCache(directory=self.directory).put(courses, numCourses,
+                                                            generate(courses, numCourses))
+
+                # A fresh cache only has the disk to go on. Either way, the order
+                # the courses are given in shouldn't matter
+                for cache in (memory, ScheduleCache(directory=self.directory)):
+                    weeks = cache.get(shuffled, numCourses)
+                    self.assertIsNotNone(weeks, (seed, numCourses))
+                    self.assertSchedules(weeks, expected, (seed, numCourses))
+
+
+if __name__ == '__main__':
+    unittest.main()